@@ -0,0 +1,211 @@
+"""
+Batch mode for the calculator.
+
+Reads one calculation per line from a file or stdin and writes one result
+per line. A line is either a command with its operands, or an expression
+(see expression.py):
+
+    div 10 4
+    pow 2 0.5
+    log 8 2
+    sqrt(3^2 + 4^2) % 7
+
+Blank lines and lines starting with "#" are skipped. A line that fails
+produces "error: <message>" in its place, and the stream goes on.
+
+Usage:
+    python batch.py operations.txt > results.txt
+    generate_ops | python batch.py --echo
+    python batch.py --precise decimal --precision 50 operations.txt
+"""
+
+import argparse
+import io
+import sys
+
+from basic_op import Calculator
+from expression import _arithmetic_error, _factorial, _power, compile_expression
+from formatting import format_result
+from higher_level_op import AdvancedCalculator, TrigonometricOperations
+from precise import MODES, PreciseCalculator
+
+
+def parse_number(text):
+    """Parse an operand as a float."""
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"Invalid number: {text!r}") from None
+
+
+def parse_integer(text):
+    """Parse an operand as an integer ("5" or "5.0")."""
+    value = parse_number(text)
+    if not value.is_integer():
+        raise ValueError(f"Expected an integer, got {text!r}")
+    return int(value)
+
+
+def build_commands(precise=None):
+    """
+    Return the dispatch table: name -> (function, arity, operand parser).
+
+    Args:
+        precise: Optional PreciseCalculator; the basic operations, sqrt and
+            log then use it and read operands exactly
+
+    fact, comb, perm and (outside precise mode) pow share the expression
+    engine's size limits, so an oversized line fails at once instead of
+    stalling the stream.
+    """
+    calc = Calculator()
+    adv_calc = AdvancedCalculator()
+    trig_calc = TrigonometricOperations()
+    number = parse_number
+    power = _power
+    if precise is not None:
+        calc = adv_calc = precise
+        number = precise.number
+        power = precise.power
+    commands = {}
+
+    def register(names, function, arity, parse=None):
+        for name in names:
+            commands[name] = (function, arity, parse or number)
+
+    register(('add', '+'), calc.add, (2,))
+    register(('sub', 'subtract', '-'), calc.subtract, (2,))
+    register(('mul', 'multiply', '*'), calc.multiply, (2,))
+    register(('div', 'divide', '/'), calc.divide, (2,))
+    register(('pow', 'power', '^'), power, (2,))
+    register(('mod', 'modulo', '%'), calc.modulo, (2,))
+    register(('sqrt',), adv_calc.square_root, (1,))
+    register(('log',), adv_calc.logarithm, (1, 2))
+    register(('fact', 'factorial'), _factorial, (1,), parse_integer)
+    register(('comb', 'ncr'), AdvancedCalculator.comb, (2,), parse_integer)
+    register(('perm', 'npr'), AdvancedCalculator.perm, (2,), parse_integer)
+    # Trigonometry is float-only
+    register(('sin',), trig_calc.sine, (1,), parse_number)
+    register(('cos',), trig_calc.cosine, (1,), parse_number)
+    register(('tan',), trig_calc.tangent, (1,), parse_number)
+    register(('cot',), trig_calc.cotangent, (1,), parse_number)
+    register(('asin',), trig_calc.asin, (1,), parse_number)
+    register(('acos',), trig_calc.acos, (1,), parse_number)
+    register(('atan',), trig_calc.atan, (1,), parse_number)
+    return commands
+
+
+COMMANDS = build_commands()
+
+def evaluate_line(line, commands=COMMANDS):
+    """
+    Evaluate one line: a command with operands, or an expression.
+
+    Raises:
+        ValueError: For unknown commands, bad operands or invalid operations
+    """
+    parts = line.split()
+    command = commands.get(parts[0].lower())
+    if command is None:
+        return compile_expression(line).evaluate()
+    function, arity, parse = command
+    if len(parts) - 1 not in arity:
+        expected = " or ".join(str(n) for n in arity)
+        raise ValueError(f"{parts[0]} takes {expected} operand(s), got {len(parts) - 1}.")
+    args = map(parse, parts[1:])
+    try:
+        return function(*args)
+    except ArithmeticError as e:
+        raise _arithmetic_error(e) from None
+
+
+def run(lines, out, echo=False, commands=COMMANDS):
+    """
+    Evaluate every line and write the results to ``out``.
+
+    Args:
+        lines: Iterable of input lines
+        out: Text stream receiving one result per evaluated line
+        echo: Write "<line>\\t<result>" instead of just the result
+        commands: Dispatch table from build_commands()
+
+    Returns:
+        Tuple of (lines evaluated, lines that failed)
+    """
+    write = out.write
+    evaluated = failed = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] == '#':
+            continue
+        evaluated += 1
+        try:
+            result = format_result(evaluate_line(line, commands))
+        except (ValueError, ArithmeticError) as e:
+            failed += 1
+            result = f"error: {e}"
+        except Exception as e:
+            failed += 1
+            result = f"error: An error occurred: {e}"
+        if echo:
+            write(f"{line}\t{result}\n")
+        else:
+            write(result + "\n")
+    return evaluated, failed
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Evaluate calculations line by line.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="file with one calculation per line (default: stdin)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="result file (default: stdout)")
+    parser.add_argument("--echo", action="store_true",
+                        help="write each input line next to its result")
+    parser.add_argument("--precise", choices=MODES,
+                        help="exact decimal or fraction arithmetic for commands")
+    parser.add_argument("--precision", type=int, default=28,
+                        help="significant digits with --precise (default: 28)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="do not print the summary to stderr")
+    args = parser.parse_args(argv)
+    if args.precision < 1:
+        parser.error("--precision must be at least 1")
+    commands = COMMANDS
+    if args.precise:
+        commands = build_commands(PreciseCalculator(args.precise, args.precision))
+
+    buffer_size = 1024 * 1024
+    if args.input == "-":
+        source = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace')
+    else:
+        source = open(args.input, 'r', encoding='utf-8', errors='replace',
+                      buffering=buffer_size)
+    if args.output == "-":
+        sys.stdout.flush()
+        out = io.TextIOWrapper(io.BufferedWriter(sys.stdout.buffer, buffer_size),
+                               encoding='utf-8')
+    else:
+        out = open(args.output, 'w', encoding='utf-8', buffering=buffer_size)
+
+    try:
+        evaluated, failed = run(source, out, args.echo, commands)
+    finally:
+        # Detach the wrappers around stdin/stdout instead of closing them
+        if args.input == "-":
+            source.detach()
+        else:
+            source.close()
+        if args.output == "-":
+            out.flush()
+            out.detach().detach()
+        else:
+            out.close()
+
+    if not args.quiet:
+        sys.stderr.write(f"Evaluated: {evaluated}\nErrors: {failed}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Throughput benchmark for the precise calculator.
+
+Compares operations per second of the float Calculator with
+PreciseCalculator in decimal and fraction mode, both on integer inputs
+(which take the exact int fast paths) and on decimal inputs (which go
+through Decimal or Fraction arithmetic).
+
+Usage:
+    python bench_precise.py [operations_per_case]
+"""
+
+import random
+import sys
+import time
+from decimal import Decimal
+from fractions import Fraction
+
+from basic_op import Calculator
+from higher_level_op import AdvancedCalculator
+from precise import PreciseCalculator
+
+
+def timed(function, pairs):
+    """Return operations per second of ``function`` over ``pairs``."""
+    start = time.perf_counter()
+    for a, b in pairs:
+        function(a, b)
+    return len(pairs) / (time.perf_counter() - start)
+
+
+def build_inputs(count):
+    """Return {input kind: {number type: [(a, b), ...]}} with matching values."""
+    rng = random.Random(42)
+    integers = [(rng.randint(1, 10 ** 6), rng.randint(1, 1000)) for _ in range(count)]
+    decimals = [(f"{rng.uniform(1, 1000):.4f}", f"{rng.uniform(1, 100):.4f}")
+                for _ in range(count)]
+    return {
+        "integers": {
+            "float": [(float(a), float(b)) for a, b in integers],
+            "decimal": integers,
+            "fraction": integers
+        },
+        "decimals": {
+            "float": [(float(a), float(b)) for a, b in decimals],
+            "decimal": [(Decimal(a), Decimal(b)) for a, b in decimals],
+            "fraction": [(Fraction(a), Fraction(b)) for a, b in decimals]
+        }
+    }
+
+
+def main():
+    """Run the benchmark."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    inputs = build_inputs(count)
+    decimal_calc = PreciseCalculator("decimal")
+    fraction_calc = PreciseCalculator("fraction")
+    # (basic, advanced) calculator for each number type
+    calculators = {
+        "float": (Calculator(), AdvancedCalculator()),
+        "decimal": (decimal_calc, decimal_calc),
+        "fraction": (fraction_calc, fraction_calc)
+    }
+    operations = [
+        ("add", lambda calc, adv: calc.add),
+        ("multiply", lambda calc, adv: calc.multiply),
+        ("divide", lambda calc, adv: calc.divide),
+        ("power ^2", lambda calc, adv: lambda a, b: calc.power(a, 2)),
+        ("sqrt", lambda calc, adv: lambda a, b: adv.square_root(a)),
+        ("log", lambda calc, adv: lambda a, b: adv.logarithm(a))
+    ]
+
+    print(f"{count} operations per case, thousands of operations per second")
+    print(f"{'':<22}" + "".join(f"{name:>10}" for name in calculators))
+    for kind, by_type in inputs.items():
+        for label, get in operations:
+            rates = [timed(get(*pair), by_type[name]) for name, pair in calculators.items()]
+            print(f"{label + ' (' + kind + ')':<22}"
+                  + "".join(f"{rate / 1000:10.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,13 @@
 #Todo: Implement errors
 #Todo: Implement a better UI
 #Todo: Implement unit tests (where needed)
-#Todo: Implement zecimals for better precision in division, logarithm and others
 
 
 from basic_op import Calculator
+from expression import compile_expression
+from formatting import format_result
 from higher_level_op import AdvancedCalculator, TrigonometricOperations
+from precise import PreciseCalculator
 
 
 def main():
@@ -18,22 +20,46 @@ def main():
 
     calc = Calculator()
     adv_calc = AdvancedCalculator()
+    # float in the normal mode, exact Decimal parsing in precise mode
+    parse = float
+
+    operations = {
+        '1': ('add', '+'),
+        '2': ('subtract', '-'),
+        '3': ('multiply', '*'),
+        '4': ('divide', '/'),
+        '5': ('power', '^'),
+        '6': ('modulo', '%')
+    }
 
     while True:
         print("Do you want to perform basic or advanced operations?")
         print("A. Advanced Operations")
         print("B. Basic Operations")
+        print("E. Evaluate an Expression")
+        print(f"P. Precise Mode ({'on' if parse is not float else 'off'})")
         print("x. Exit")
 
-        choice = input("Select an option (A/B/x): ").strip().lower()
+        choice = input("Select an option (A/B/E/P/x): ").strip().lower()
         if choice == 'x':
             print("Thank you for using the calculator!")
             break
 
-        if choice not in ['a', 'b']:
+        if choice not in ['a', 'b', 'e', 'p']:
             print("Invalid choice! Please try again.")
             continue
 
+        if choice == 'p':
+            if parse is float:
+                calc = adv_calc = PreciseCalculator()
+                parse = calc.number
+                print("Precise mode on: basic and advanced operations use "
+                      f"{calc.context.prec}-digit decimals.\n")
+            else:
+                calc, adv_calc, parse = Calculator(), AdvancedCalculator(), float
+                print("Precise mode off.\n")
+            continue
+
         if choice == 'b':
             while True:
                 print("\nOperations:")
@@ -55,22 +81,33 @@ def main():
                     continue
 
                 try:
-                    num1 = float(input("Enter first number: "))
-                    num2 = float(input("Enter second number: "))
+                    num1 = parse(input("Enter first number: "))
+                    num2 = parse(input("Enter second number: "))
 
-                    operations = {
-                        '1': (calc.add, '+'),
-                        '2': (calc.subtract, '-'),
-                        '3': (calc.multiply, '*'),
-                        '4': (calc.divide, '/'),
-                        '5': (calc.power, '^'),
-                        '6': (calc.modulo, '%')
-                    }
+                    name, symbol = operations[op_choice]
+                    result = getattr(calc, name)(num1, num2)
 
-                    operation, symbol = operations[op_choice]
-                    result = operation(num1, num2)
+                    print(f"\nResult: {num1} {symbol} {num2} = {format_result(result)}")
 
-                    print(f"\nResult: {num1} {symbol} {num2} = {result}")
+                except ValueError as e:
+                    print(f"Error: {e}")
+                except Exception as e:
+                    print(f"An error occurred: {e}")
+
+        elif choice == 'e':
+            print("\nEnter expressions such as sqrt(x^2 + y^2) % 7 (empty line to go back).")
+            while True:
+                source = input("\nExpression: ").strip()
+                if not source:
+                    break
+
+                try:
+                    expression = compile_expression(source)
+                    variables = {name: float(input(f"Enter {name}: "))
+                                 for name in expression.variables}
+                    result = expression.evaluate(variables)
+
+                    print(f"\nResult: {format_result(result)}")
 
                 except ValueError as e:
                     print(f"Error: {e}")
@@ -84,25 +121,34 @@ def main():
                 print("2. Logarithm")
                 print("3. Factorial")
                 print("4. Do you want to perform trigonometric operations?")
+                print("5. Combinations (nCr)")
+                print("6. Permutations (nPr)")
                 print("0. Exit")
 
-                adv_choice = input("\nSelect operation (0-4): ").strip()
+                adv_choice = input("\nSelect operation (0-6): ").strip()
 
                 if adv_choice == '0':
                     break
 
                 try:
                     if adv_choice == '1':
-                        value = float(input("Enter a number: "))
+                        value = parse(input("Enter a number: "))
                         result = adv_calc.square_root(value)
                     elif adv_choice == '2':
-                        value = float(input("Enter a number: "))
+                        value = parse(input("Enter a number: "))
                         base_input = input("Enter the base (default 10): ").strip()
-                        base = float(base_input) if base_input else 10
+                        base = parse(base_input) if base_input else 10
                         result = adv_calc.logarithm(value, base)
                     elif adv_choice == '3':
                         n = int(input("Enter a non-negative integer: "))
                         result = adv_calc.factorial(n)
+                    elif adv_choice in ('5', '6'):
+                        n = int(input("Enter n: "))
+                        k = int(input("Enter k: "))
+                        if adv_choice == '5':
+                            result = AdvancedCalculator.comb(n, k)
+                        else:
+                            result = AdvancedCalculator.perm(n, k)
                     elif adv_choice == '4':
                         trig_calc = TrigonometricOperations()
                         print("\nTrigonometric Operations:")
@@ -140,7 +186,7 @@ def main():
                         print("Invalid choice! Please try again.")
                         continue
 
-                    print(f"\nResult: {result}")
+                    print(f"\nResult: {format_result(result)}")
 
                 except ValueError as e:
                     print(f"Error: {e}")
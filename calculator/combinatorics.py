@@ -0,0 +1,384 @@
+"""
+Combinatorics for the calculator.
+
+Combinatorics computes factorials, binomials (nCr) and permutations (nPr)
+exactly, remembering results in bounded memo tables so repeated values are
+not recomputed:
+
+    - factorials of small n live in a table grown one product at a time
+    - larger factorials, binomials and permutations go in an LRU cache
+      capped by the total size (in bits) of the integers it holds
+
+For huge n the log-space methods (log_factorial, log_comb, log_perm) and the
+float approximations built on them use math.lgamma, so the exact big
+integer is never computed unless one of the exact methods is called.
+
+ModularCombinatorics answers factorials and binomials modulo a prime from
+precomputed factorial and inverse-factorial tables, in O(1) per query.
+"""
+
+import math
+from array import array
+from collections import OrderedDict
+
+
+LN2 = math.log(2)
+LN10 = math.log(10)
+# Results below 2**1000 are computed exactly before converting to float
+_FLOAT_BITS = 1000
+
+
+def _as_integer(value, name="n"):
+    """Return value as an int, accepting integral floats ("5.0")."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if not isinstance(value, int):
+        raise ValueError(f"{name} must be an integer.")
+    return value
+
+
+def _check_arguments(n, k):
+    n = _as_integer(n)
+    k = _as_integer(k, "k")
+    if n < 0 or k < 0:
+        raise ValueError("n and k must be non-negative.")
+    return n, k
+
+
+def to_scientific(log_value, digits=6):
+    """
+    Format a natural-log value as a number in scientific notation.
+
+    Example:
+        to_scientific(Combinatorics().log_factorial(10 ** 6))  # '8.26393e+5565708'
+    """
+    if log_value == -math.inf:
+        return "0"
+    log10 = log_value / LN10
+    exponent = math.floor(log10)
+    mantissa = 10 ** (log10 - exponent)
+    if round(mantissa, digits - 1) >= 10:
+        mantissa, exponent = mantissa / 10, exponent + 1
+    return f"{mantissa:.{digits - 1}f}e{exponent:+d}"
+
+
+class Combinatorics:
+    """Exact and log-space factorials, binomials and permutations with memo tables."""
+
+    def __init__(self, table_size=256, cache_bits=1 << 24, max_bits=1 << 24):
+        """
+        Args:
+            table_size: Factorials below this n are kept in a table (default: 256)
+            cache_bits: Total size in bits of the results kept in the LRU
+                cache (default: 2 MiB worth)
+            max_bits: Refuse exact results estimated to be larger than this
+                many bits (use the log-space methods for those); None
+                removes the limit (default: 2 MiB worth)
+        """
+        self.table_size = table_size
+        self.cache_bits = cache_bits
+        self.max_bits = max_bits
+        self._factorials = [1]
+        self._cache = OrderedDict()
+        self._cached_bits = 0
+        self.hits = 0
+        self.misses = 0
+
+    # Memo tables
+
+    def _table_factorial(self, n):
+        table = self._factorials
+        while len(table) <= n:
+            table.append(table[-1] * len(table))
+        return table[n]
+
+    def _cached(self, key, compute):
+        """Return the memoized value for key, computing and storing it on a miss."""
+        cache = self._cache
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        bits = value.bit_length()
+        if bits <= self.cache_bits:
+            cache[key] = value
+            self._cached_bits += bits
+            while self._cached_bits > self.cache_bits:
+                _, evicted = cache.popitem(last=False)
+                self._cached_bits -= evicted.bit_length()
+        return value
+
+    def _check_size(self, log_value):
+        if self.max_bits is not None and log_value / LN2 > self.max_bits:
+            raise ValueError("Result is too large.")
+
+    def clear(self):
+        """Empty the memo tables."""
+        self._factorials = [1]
+        self._cache.clear()
+        self._cached_bits = 0
+
+    # Exact values
+
+    def factorial(self, n):
+        """n! as an exact integer."""
+        n = _as_integer(n)
+        if n < 0:
+            raise ValueError("Factorial is undefined for negative numbers.")
+        if n < self.table_size:
+            return self._table_factorial(n)
+        self._check_size(math.lgamma(n + 1))
+        return self._cached(('!', n), lambda: math.factorial(n))
+
+    def comb(self, n, k):
+        """Number of ways to choose k items from n without order (nCr)."""
+        n, k = _check_arguments(n, k)
+        if k > n:
+            return 0
+        k = min(k, n - k)
+        if k <= 1:
+            return n if k else 1
+        if n < self.table_size:
+            # Small binomials cost less to compute than to look up
+            return math.comb(n, k)
+        self._check_size(self.log_comb(n, k))
+        return self._cached(('C', n, k), lambda: math.comb(n, k))
+
+    def perm(self, n, k=None):
+        """Number of ordered arrangements of k items out of n (nPr); n! without k."""
+        if k is None:
+            return self.factorial(n)
+        n, k = _check_arguments(n, k)
+        if k > n:
+            return 0
+        if k <= 1:
+            return n if k else 1
+        if n < self.table_size:
+            return math.perm(n, k)
+        self._check_size(self.log_perm(n, k))
+        return self._cached(('P', n, k), lambda: math.perm(n, k))
+
+    # Log space (natural logarithms); no big integers are built
+
+    def log_factorial(self, n):
+        """ln(n!)."""
+        n = _as_integer(n)
+        if n < 0:
+            raise ValueError("Factorial is undefined for negative numbers.")
+        if n < len(self._factorials):
+            return math.log(self._factorials[n])
+        return math.lgamma(n + 1)
+
+    def log_comb(self, n, k):
+        """ln(nCr); -inf when k > n."""
+        n, k = _check_arguments(n, k)
+        if k > n:
+            return -math.inf
+        if n < self.table_size:
+            return math.log(math.comb(n, k))
+        return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+    def log_perm(self, n, k):
+        """ln(nPr); -inf when k > n."""
+        n, k = _check_arguments(n, k)
+        if k > n:
+            return -math.inf
+        if n < self.table_size:
+            return math.log(math.perm(n, k))
+        return math.lgamma(n + 1) - math.lgamma(n - k + 1)
+
+    def comb_float(self, n, k):
+        """nCr as a float (inf when it does not fit), without the exact integer."""
+        log_value = self.log_comb(n, k)
+        if log_value / LN2 < _FLOAT_BITS:
+            # Small enough that the exact value is cheap and rounds correctly
+            return float(math.comb(*_check_arguments(n, k)))
+        return _exp(log_value)
+
+    def perm_float(self, n, k):
+        """nPr as a float (inf when it does not fit), without the exact integer."""
+        log_value = self.log_perm(n, k)
+        if log_value / LN2 < _FLOAT_BITS:
+            return float(math.perm(*_check_arguments(n, k)))
+        return _exp(log_value)
+
+    def binomial_probability(self, n, k, p):
+        """
+        Probability of exactly k successes in n trials with success chance p.
+
+        Computed in log space, so it works for any n.
+        """
+        n, k = _check_arguments(n, k)
+        if not 0 <= p <= 1:
+            raise ValueError("Probability must be in the range [0, 1].")
+        if k > n:
+            return 0.0
+        if p == 0 or p == 1:
+            return float(k == (n if p == 1 else 0))
+        return math.exp(self.log_comb(n, k) + k * math.log(p) + (n - k) * math.log1p(-p))
+
+    def stats(self):
+        """Return memo table counters."""
+        return {
+            'table_size': len(self._factorials),
+            'cached': len(self._cache),
+            'cached_bits': self._cached_bits,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+def _exp(log_value):
+    try:
+        return math.exp(log_value)
+    except OverflowError:
+        return math.inf
+
+
+def _is_prime(n):
+    """Deterministic Miller-Rabin for n < 3.3e24 (probable prime above)."""
+    if n < 2:
+        return False
+    small_primes = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+    for p in small_primes:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in small_primes:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+class ModularCombinatorics:
+    """Factorials and binomials modulo a prime, from precomputed tables."""
+
+    def __init__(self, modulus=10 ** 9 + 7, size=1024, max_size=1 << 20):
+        """
+        Args:
+            modulus: A prime modulus (default: 10^9 + 7)
+            size: Precompute the tables up to this n (default: 1024)
+            max_size: Tables grow on demand up to this n; larger arguments are
+                computed directly (default: 2^20)
+        """
+        if not _is_prime(modulus):
+            raise ValueError("Modulus must be a prime number.")
+        self.modulus = modulus
+        self.max_size = max_size
+        # Residues fit in 64 bits for the usual moduli; keep them unboxed
+        typecode = 'Q' if modulus < 1 << 64 else None
+        self._factorials = array(typecode, [1]) if typecode else [1]
+        self._inverses = array(typecode, [1]) if typecode else [1]
+        self._extend(min(size, modulus - 1, max_size))
+
+    def _extend(self, n):
+        """Grow both tables to cover n."""
+        old = len(self._factorials) - 1
+        if n <= old:
+            return
+        p = self.modulus
+        factorials = self._factorials
+        value = factorials[-1]
+        for i in range(old + 1, n + 1):
+            value = value * i % p
+            factorials.append(value)
+        # One modular inverse for the top, then walk down: 1/(i-1)! = i/i!
+        inverses = [0] * (n - old)
+        inverse = pow(value, -1, p)
+        for i in range(n, old, -1):
+            inverses[i - old - 1] = inverse
+            inverse = inverse * i % p
+        self._inverses.extend(inverses)
+
+    def _reachable(self, n):
+        """Return True if n is (or can be) in the tables."""
+        if n < len(self._factorials):
+            return True
+        if n <= self.max_size:
+            # Grow geometrically so a rising sequence of queries is amortized
+            self._extend(min(max(n, 2 * len(self._factorials)), self.max_size,
+                             self.modulus - 1))
+            return True
+        return False
+
+    def factorial(self, n):
+        """n! mod p."""
+        n = _as_integer(n)
+        if n < 0:
+            raise ValueError("Factorial is undefined for negative numbers.")
+        if n >= self.modulus:
+            return 0
+        if self._reachable(n):
+            return self._factorials[n]
+        value = self._factorials[-1]
+        for i in range(len(self._factorials), n + 1):
+            value = value * i % self.modulus
+        return value
+
+    def inverse_factorial(self, n):
+        """(n!)^-1 mod p."""
+        n = _as_integer(n)
+        if n < 0 or n >= self.modulus:
+            raise ValueError("n! has no inverse modulo p.")
+        if self._reachable(n):
+            return self._inverses[n]
+        return pow(self.factorial(n), -1, self.modulus)
+
+    def _small_comb(self, n, k):
+        """nCr mod p for 0 <= k <= n < p."""
+        if self._reachable(n):
+            return (self._factorials[n] * self._inverses[k] % self.modulus
+                    * self._inverses[n - k] % self.modulus)
+        p = self.modulus
+        k = min(k, n - k)
+        numerator = 1
+        for i in range(n - k + 1, n + 1):
+            numerator = numerator * i % p
+        return numerator * self.inverse_factorial(k) % p
+
+    def comb(self, n, k):
+        """nCr mod p; uses Lucas' theorem when n >= p."""
+        n, k = _check_arguments(n, k)
+        if k > n:
+            return 0
+        p = self.modulus
+        result = 1
+        while n and result:
+            n, n_digit = divmod(n, p)
+            k, k_digit = divmod(k, p)
+            if k_digit > n_digit:
+                return 0
+            result = result * self._small_comb(n_digit, k_digit) % p
+        return result
+
+    def perm(self, n, k):
+        """nPr mod p."""
+        n, k = _check_arguments(n, k)
+        if k > n:
+            return 0
+        if n >= self.modulus:
+            # n * (n-1) * ... * (n-k+1) contains a multiple of p if n % p < k
+            if n % self.modulus < k:
+                return 0
+            return self._perm_product(n, k)
+        return self.factorial(n) * self.inverse_factorial(n - k) % self.modulus
+
+    def _perm_product(self, n, k):
+        p = self.modulus
+        value = 1
+        for i in range(n - k + 1, n + 1):
+            value = value * (i % p) % p
+        return value
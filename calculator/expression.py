@@ -0,0 +1,346 @@
+"""
+Expression engine for the calculator.
+
+Formulas such as "sqrt(x^2 + y^2) % 7" are parsed without eval() and
+compiled once into a tree of closures over the Calculator,
+AdvancedCalculator and TrigonometricOperations methods. Compiled
+expressions are cached by source text, so repeated formulas skip parsing.
+
+Syntax:
+    numbers     2, 3.5, 1e-3
+    variables   x, rate, y2
+    operators   + - * / % ^ (or **), unary + and -, postfix ! (factorial)
+    functions   sqrt, log(x[, base]), ln, factorial, comb(n, k), perm(n, k),
+                sin, cos, tan, cot, asin, acos, atan, abs
+    constants   pi, e, tau
+"""
+
+import math
+import re
+from functools import lru_cache
+
+from basic_op import Calculator
+from higher_level_op import MAX_RESULT_BITS, AdvancedCalculator, TrigonometricOperations
+
+
+class ExpressionError(ValueError):
+    """Raised for malformed expressions."""
+
+
+_calc = Calculator()
+
+# Integer results are exact; refuse ones too big to compute in reasonable time
+MAX_INTEGER_BITS = MAX_RESULT_BITS
+MAX_FACTORIAL = 50000
+
+
+def _power(a, b):
+    if (isinstance(a, int) and isinstance(b, int) and b > 0
+            and a.bit_length() * b > MAX_INTEGER_BITS):
+        raise ValueError("Result is too large.")
+    result = _calc.power(a, b)
+    if isinstance(result, complex):
+        raise ValueError("Power of a negative number to a fractional exponent is not real.")
+    return result
+
+
+def _factorial(n):
+    if isinstance(n, float) and n.is_integer():
+        n = int(n)
+    if isinstance(n, int) and n > MAX_FACTORIAL:
+        raise ValueError("Result is too large.")
+    return AdvancedCalculator.factorial(n)
+
+
+BINARY_OPERATORS = {
+    '+': _calc.add,
+    '-': _calc.subtract,
+    '*': _calc.multiply,
+    '/': _calc.divide,
+    '%': _calc.modulo,
+    '^': _power
+}
+
+
+def _ln(value):
+    return AdvancedCalculator.logarithm(value, math.e)
+
+
+# name -> (function, minimum arguments, maximum arguments)
+FUNCTIONS = {
+    'sqrt': (AdvancedCalculator.square_root, 1, 1),
+    'log': (AdvancedCalculator.logarithm, 1, 2),
+    'ln': (_ln, 1, 1),
+    'factorial': (_factorial, 1, 1),
+    'comb': (AdvancedCalculator.comb, 2, 2),
+    'perm': (AdvancedCalculator.perm, 2, 2),
+    'sin': (TrigonometricOperations.sine, 1, 1),
+    'cos': (TrigonometricOperations.cosine, 1, 1),
+    'tan': (TrigonometricOperations.tangent, 1, 1),
+    'cot': (TrigonometricOperations.cotangent, 1, 1),
+    'asin': (TrigonometricOperations.asin, 1, 1),
+    'acos': (TrigonometricOperations.acos, 1, 1),
+    'atan': (TrigonometricOperations.atan, 1, 1),
+    'abs': (abs, 1, 1)
+}
+
+CONSTANTS = {'pi': math.pi, 'e': math.e, 'tau': math.tau}
+
+_TOKEN = re.compile(r"""
+    (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_]\w*)
+  | (?P<op>\*\*|[-+*/%^!(),])
+""", re.VERBOSE)
+_SPACE = re.compile(r"\s*")
+
+
+def tokenize(source):
+    """Split an expression into (kind, value, position) tokens."""
+    tokens = []
+    pos = _SPACE.match(source).end()
+    while pos < len(source):
+        match = _TOKEN.match(source, pos)
+        if not match:
+            raise ExpressionError(f"Unexpected character {source[pos]!r} at position {pos}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'number':
+            value = float(value) if any(c in value for c in '.eE') else int(value)
+        elif value == '**':
+            value = '^'
+        tokens.append((kind, value, pos))
+        pos = _SPACE.match(source, match.end()).end()
+    tokens.append(('end', None, len(source)))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing closures of the form f(env)."""
+
+    def __init__(self, source):
+        self.tokens = tokenize(source)
+        self.index = 0
+        self.variables = set()
+
+    def peek(self):
+        return self.tokens[self.index]
+
+    def advance(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def expect(self, value):
+        kind, found, pos = self.advance()
+        if found != value or kind != 'op':
+            raise ExpressionError(f"Expected {value!r} at position {pos}")
+
+    def parse(self):
+        node = self.expression()
+        kind, value, pos = self.peek()
+        if kind != 'end':
+            raise ExpressionError(f"Unexpected {value!r} at position {pos}")
+        return node
+
+    # Grammar, lowest precedence first:
+    #   expression := term (("+" | "-") term)*
+    #   term       := unary (("*" | "/" | "%") unary)*
+    #   unary      := ("+" | "-") unary | power
+    #   power      := postfix ("^" unary)?        (right-associative)
+    #   postfix    := primary "!"*
+    #   primary    := number | name | name "(" args ")" | "(" expression ")"
+
+    def expression(self):
+        node = self.term()
+        while self.peek()[1] in ('+', '-') and self.peek()[0] == 'op':
+            operator = self.advance()[1]
+            node = _binary(operator, node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek()[1] in ('*', '/', '%') and self.peek()[0] == 'op':
+            operator = self.advance()[1]
+            node = _binary(operator, node, self.unary())
+        return node
+
+    def unary(self):
+        kind, value, _ = self.peek()
+        if kind == 'op' and value in ('+', '-'):
+            self.advance()
+            operand = self.unary()
+            if value == '+':
+                return operand
+            return _call(_negate, [operand])
+        return self.power()
+
+    def power(self):
+        node = self.postfix()
+        kind, value, _ = self.peek()
+        if kind == 'op' and value == '^':
+            self.advance()
+            node = _binary('^', node, self.unary())
+        return node
+
+    def postfix(self):
+        node = self.primary()
+        while self.peek()[0] == 'op' and self.peek()[1] == '!':
+            self.advance()
+            node = _call(_factorial, [node])
+        return node
+
+    def primary(self):
+        kind, value, pos = self.advance()
+        if kind == 'number':
+            return _Constant(value)
+        if kind == 'name':
+            if self.peek()[0] == 'op' and self.peek()[1] == '(':
+                return self.function_call(value, pos)
+            if value in CONSTANTS:
+                return _Constant(CONSTANTS[value])
+            if value in FUNCTIONS:
+                raise ExpressionError(f"Function {value!r} needs arguments at position {pos}")
+            self.variables.add(value)
+            return _variable(value)
+        if kind == 'op' and value == '(':
+            node = self.expression()
+            self.expect(')')
+            return node
+        if kind == 'end':
+            raise ExpressionError("Unexpected end of expression")
+        raise ExpressionError(f"Unexpected {value!r} at position {pos}")
+
+    def function_call(self, name, pos):
+        if name not in FUNCTIONS:
+            raise ExpressionError(f"Unknown function {name!r} at position {pos}")
+        function, min_args, max_args = FUNCTIONS[name]
+        self.expect('(')
+        args = [self.expression()]
+        while self.peek()[0] == 'op' and self.peek()[1] == ',':
+            self.advance()
+            args.append(self.expression())
+        self.expect(')')
+        if not min_args <= len(args) <= max_args:
+            raise ExpressionError(f"{name}() takes {min_args}"
+                                  f"{'' if min_args == max_args else f'-{max_args}'} "
+                                  f"argument(s), got {len(args)}")
+        return _call(function, args)
+
+
+def _negate(value):
+    return -value
+
+
+class _Constant:
+    """A compiled constant; calls return the value itself."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self, env):
+        return self.value
+
+
+def _variable(name):
+    def evaluate(env):
+        return env[name]
+    return evaluate
+
+
+def _binary(operator, left, right):
+    """Compile a binary operation."""
+    return _call(BINARY_OPERATORS[operator], [left, right])
+
+
+def _call(function, args):
+    """Compile a call, folding it when every argument is constant."""
+    if all(isinstance(arg, _Constant) for arg in args):
+        try:
+            return _Constant(function(*(arg.value for arg in args)))
+        except (ValueError, ArithmeticError):
+            # Leave the error to evaluation time
+            pass
+    if len(args) == 1:
+        (arg,) = args
+        return lambda env: function(arg(env))
+    if len(args) == 2:
+        left, right = args
+        if isinstance(right, _Constant):
+            right_value = right.value
+            return lambda env: function(left(env), right_value)
+        if isinstance(left, _Constant):
+            left_value = left.value
+            return lambda env: function(left_value, right(env))
+        return lambda env: function(left(env), right(env))
+    return lambda env: function(*(arg(env) for arg in args))
+
+
+def _arithmetic_error(error):
+    """Turn an OverflowError or ZeroDivisionError into a ValueError."""
+    if isinstance(error, OverflowError):
+        return ValueError("Result is too large.")
+    return ValueError(str(error).capitalize() + ".")
+
+
+class Expression:
+    """A compiled expression, reusable for any variable bindings."""
+
+    def __init__(self, source):
+        """
+        Parse and compile an expression.
+
+        Raises:
+            ExpressionError: If the expression is malformed
+        """
+        if not source or not source.strip():
+            raise ExpressionError("Expression cannot be empty!")
+        parser = _Parser(source)
+        self.source = source
+        self._evaluate = parser.parse()
+        self.variables = tuple(sorted(parser.variables))
+
+    def __call__(self, **variables):
+        """Evaluate with variables given as keyword arguments."""
+        return self.evaluate(variables)
+
+    def evaluate(self, variables=None):
+        """
+        Evaluate with variables from a mapping.
+
+        Raises:
+            ValueError: For missing variables or invalid operations
+        """
+        variables = variables or {}
+        try:
+            return self._evaluate(variables)
+        except KeyError as e:
+            raise ValueError(f"No value given for variable {e.args[0]!r}.") from None
+        except ArithmeticError as e:
+            raise _arithmetic_error(e) from None
+
+    def evaluate_many(self, rows):
+        """Evaluate for each mapping of variables in ``rows``, lazily."""
+        evaluate = self._evaluate
+        for variables in rows:
+            try:
+                yield evaluate(variables)
+            except KeyError as e:
+                raise ValueError(f"No value given for variable {e.args[0]!r}.") from None
+            except ArithmeticError as e:
+                raise _arithmetic_error(e) from None
+
+    def __repr__(self):
+        return f"Expression({self.source!r})"
+
+
+@lru_cache(maxsize=256)
+def compile_expression(source):
+    """Return the compiled Expression for a source text, cached."""
+    return Expression(source)
+
+
+def evaluate(source, **variables):
+    """Compile (or fetch from the cache) and evaluate an expression."""
+    return compile_expression(source).evaluate(variables)
@@ -0,0 +1,54 @@
+"""
+Result formatting for the calculator.
+
+Turns results into text for the menu and batch mode, including integers
+longer than the 4300 digits str() accepts on Python 3.11+.
+"""
+
+import math
+from fractions import Fraction
+
+
+# Longer integers are written in scientific notation; exact text this long
+# already takes a fraction of a second to produce
+MAX_EXACT_DIGITS = 100000
+_LOG10_2 = math.log10(2)
+
+
+def format_result(value):
+    """
+    Return a result as text, including integers past Python's str() limit.
+
+    Integers of up to MAX_EXACT_DIGITS digits are written in full; longer
+    ones as "d.ddddddddde+N" with 10 significant digits.
+    """
+    if isinstance(value, Fraction):
+        return f"{format_result(value.numerator)}/{format_result(value.denominator)}"
+    if not isinstance(value, int) or value.bit_length() < 10000:
+        return str(value)
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    if value.bit_length() * _LOG10_2 < MAX_EXACT_DIGITS:
+        return sign + _int_to_str(value)
+    # Keep the top 64 bits: log10(value) = log10(top) + shift * log10(2)
+    shift = value.bit_length() - 64
+    log10 = math.log10(value >> shift) + shift * _LOG10_2
+    exponent = math.floor(log10)
+    mantissa = round(10 ** (log10 - exponent), 9)
+    if mantissa >= 10:
+        mantissa, exponent = mantissa / 10, exponent + 1
+    return f"{sign}{mantissa:.9f}e+{exponent}"
+
+
+def _int_to_str(value):
+    """
+    Write a non-negative integer in decimal without str()'s 4300-digit limit.
+
+    The number is split in halves with divmod by a power of ten until the
+    pieces are short enough for str(); no interpreter-wide setting changes.
+    """
+    if value.bit_length() < 10000:
+        return str(value)
+    half = int(value.bit_length() * _LOG10_2) // 2
+    high, low = divmod(value, 10 ** half)
+    return _int_to_str(high) + _int_to_str(low).zfill(half)
@@ -1,5 +1,15 @@
 import math
 
+from combinatorics import Combinatorics
+
+# Exact results larger than this raise "Result is too large." instead of
+# blocking for seconds and then sitting in the memo tables
+MAX_RESULT_BITS = 1 << 20
+
+# Shared memo tables
+_combinatorics = Combinatorics(max_bits=MAX_RESULT_BITS)
+
+
 class AdvancedCalculator:
     @staticmethod
     def square_root(value):
@@ -19,7 +29,15 @@ class AdvancedCalculator:
             raise ValueError("Factorial is undefined for negative numbers.")
         if not isinstance(n, int):
             raise ValueError("Factorial is only defined for integers.")
-        return math.factorial(n)
+        return _combinatorics.factorial(n)
+
+    @staticmethod
+    def comb(n, k):
+        return _combinatorics.comb(n, k)
+
+    @staticmethod
+    def perm(n, k):
+        return _combinatorics.perm(n, k)
 
 class TrigonometricOperations:
     @staticmethod
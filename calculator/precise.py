@@ -0,0 +1,265 @@
+"""
+Arbitrary-precision calculator.
+
+PreciseCalculator offers the Calculator and AdvancedCalculator operations
+on decimal.Decimal or fractions.Fraction values instead of floats.
+Numbers may be given as strings ("0.1"), ints, floats, Decimals or
+Fractions; strings are read exactly.
+
+When a result is provably exact as a plain integer (integer add, subtract,
+multiply and power, divisions that come out even, perfect squares,
+logarithms of exact powers of the base), it is computed with int
+arithmetic and returned as an int, so the common cases cost little.
+Everything else goes through the configured Decimal context or exact
+Fraction arithmetic. Results that are irrational (roots, logarithms,
+fractional powers) are Decimals rounded to the context precision, in
+both modes.
+"""
+
+import decimal
+import functools
+import math
+from decimal import Decimal
+from fractions import Fraction
+
+from basic_op import Calculator
+from higher_level_op import AdvancedCalculator
+
+
+MODES = ("decimal", "fraction")
+
+# Floats with an integer value below this are converted to int exactly
+_EXACT_FLOAT_INT = 2 ** 53
+# Integer powers whose result would exceed this many bits go through Decimal
+_MAX_EXACT_POWER_BITS = 1 << 16
+
+
+def _overflow_checked(method):
+    """Report decimal.Overflow from an operation as a ValueError."""
+    @functools.wraps(method)
+    def wrapper(*args):
+        try:
+            return method(*args)
+        except decimal.Overflow:
+            raise ValueError("Result is too large.") from None
+    return wrapper
+
+
+class PreciseCalculator(Calculator):
+    """Calculator and advanced operations in Decimal or Fraction arithmetic."""
+
+    def __init__(self, mode="decimal", precision=28, context=None):
+        """
+        Args:
+            mode: "decimal" or "fraction"
+            precision: Significant digits for Decimal results (default: 28)
+            context: A decimal.Context to use instead of ``precision``
+        """
+        if mode not in MODES:
+            raise ValueError(f"Mode must be one of {', '.join(MODES)}.")
+        self.mode = mode
+        self._type = Fraction if mode == "fraction" else Decimal
+        self.context = context or decimal.Context(prec=precision,
+                                                  rounding=decimal.ROUND_HALF_EVEN)
+
+    def number(self, value):
+        """
+        Convert an input to an int, Decimal or Fraction without losing precision.
+
+        Floats are taken at their shortest decimal form, so 0.1 means 0.1.
+        """
+        cls = type(value)
+        if cls is int:
+            return value
+        if cls is self._type:
+            return self._normalize(value)
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, int):
+            return value
+        if isinstance(value, float):
+            if value.is_integer() and abs(value) < _EXACT_FLOAT_INT:
+                return int(value)
+            value = repr(value)
+        if isinstance(value, str):
+            text = value.strip()
+            try:
+                if self.mode == "fraction" and '/' in text:
+                    result = Fraction(text)
+                else:
+                    result = Decimal(text)
+            except (ValueError, ArithmeticError):
+                raise ValueError(f"Invalid number: {value!r}") from None
+            if isinstance(result, Decimal):
+                if not result.is_finite():
+                    raise ValueError(f"Invalid number: {value!r}")
+                self._check_range(result, value)
+                if self.mode == "fraction":
+                    result = Fraction(result)
+        elif isinstance(value, Fraction):
+            result = value if self.mode == "fraction" else self._to_decimal(value)
+        elif isinstance(value, Decimal):
+            if self.mode == "fraction":
+                self._check_range(value, value)
+                value = Fraction(value)
+            result = value
+        else:
+            raise ValueError(f"Unsupported number: {value!r}")
+        return self._normalize(result)
+
+    def _check_range(self, value, original):
+        """
+        Reject exponents outside the context's Emin/Emax.
+
+        As a Fraction, 1e999999999 would be a billion-digit integer.
+        """
+        if value and not self.context.Emin <= value.adjusted() <= self.context.Emax:
+            raise ValueError(f"Number is out of range: {original!r}")
+
+    def _normalize(self, value):
+        """Return integral Decimal and Fraction values as ints."""
+        if type(value) is Fraction:
+            return value.numerator if value.denominator == 1 else value
+        # Keep huge exponents (1E+1000000) as Decimal
+        if value == value.to_integral_value() and value.is_finite() and value.adjusted() < 1000:
+            return int(value)
+        return value
+
+    def _to_decimal(self, value):
+        if type(value) is Decimal:
+            return value
+        if type(value) is Fraction:
+            return self.context.divide(Decimal(value.numerator), Decimal(value.denominator))
+        return Decimal(value)
+
+    @_overflow_checked
+    def add(self, a, b):
+        """Add two numbers."""
+        a, b = self.number(a), self.number(b)
+        if type(a) is int and type(b) is int:
+            return a + b
+        if self.mode == "fraction":
+            return self._normalize(Fraction(a) + Fraction(b))
+        return self._normalize(self.context.add(self._to_decimal(a), self._to_decimal(b)))
+
+    @_overflow_checked
+    def subtract(self, a, b):
+        """Subtract b from a."""
+        a, b = self.number(a), self.number(b)
+        if type(a) is int and type(b) is int:
+            return a - b
+        if self.mode == "fraction":
+            return self._normalize(Fraction(a) - Fraction(b))
+        return self._normalize(self.context.subtract(self._to_decimal(a), self._to_decimal(b)))
+
+    @_overflow_checked
+    def multiply(self, a, b):
+        """Multiply two numbers."""
+        a, b = self.number(a), self.number(b)
+        if type(a) is int and type(b) is int:
+            return a * b
+        if self.mode == "fraction":
+            return self._normalize(Fraction(a) * Fraction(b))
+        return self._normalize(self.context.multiply(self._to_decimal(a), self._to_decimal(b)))
+
+    @_overflow_checked
+    def divide(self, a, b):
+        """Divide a by b."""
+        a, b = self.number(a), self.number(b)
+        if b == 0:
+            raise ValueError("Cannot divide by zero!")
+        if type(a) is int and type(b) is int:
+            quotient, remainder = divmod(a, b)
+            if not remainder:
+                return quotient
+        if self.mode == "fraction":
+            return self._normalize(Fraction(a) / Fraction(b))
+        return self._normalize(self.context.divide(self._to_decimal(a), self._to_decimal(b)))
+
+    @_overflow_checked
+    def power(self, a, b):
+        """Raise a to the power of b."""
+        a, b = self.number(a), self.number(b)
+        if type(b) is int:
+            if type(a) is int and b >= 0 and a.bit_length() * b <= _MAX_EXACT_POWER_BITS:
+                return a ** b
+            if a == 0 and b < 0:
+                raise ValueError("Cannot raise zero to a negative power!")
+            if self.mode == "fraction" and abs(b) <= _MAX_EXACT_POWER_BITS:
+                base = Fraction(a)
+                if base.numerator.bit_length() * abs(b) <= _MAX_EXACT_POWER_BITS:
+                    return self._normalize(base ** b)
+        if a < 0 and type(b) is not int:
+            raise ValueError("Power of a negative number to a fractional exponent is not real.")
+        if a == 0 and b < 0:
+            raise ValueError("Cannot raise zero to a negative power!")
+        return self._normalize(self.context.power(self._to_decimal(a), self._to_decimal(b)))
+
+    @_overflow_checked
+    def modulo(self, a, b):
+        """Return the remainder of a divided by b (same sign as b, like float %)."""
+        a, b = self.number(a), self.number(b)
+        if b == 0:
+            raise ValueError("Cannot perform modulo with zero!")
+        if type(a) is int and type(b) is int:
+            return a % b
+        if self.mode == "fraction":
+            return self._normalize(Fraction(a) % Fraction(b))
+        remainder = self.context.remainder(self._to_decimal(a), self._to_decimal(b))
+        if remainder and (remainder < 0) != (b < 0):
+            remainder = self.context.add(remainder, self._to_decimal(b))
+        return self._normalize(remainder)
+
+    @_overflow_checked
+    def square_root(self, value):
+        """Square root; exact for perfect squares, else rounded to the context."""
+        value = self.number(value)
+        if value < 0:
+            raise ValueError("Cannot compute square root of a negative number.")
+        if type(value) is int:
+            root = math.isqrt(value)
+            if root * root == value:
+                return root
+        elif isinstance(value, Fraction):
+            numerator, denominator = math.isqrt(value.numerator), math.isqrt(value.denominator)
+            if numerator ** 2 == value.numerator and denominator ** 2 == value.denominator:
+                return Fraction(numerator, denominator)
+        return self._normalize(self.context.sqrt(self._to_decimal(value)))
+
+    @_overflow_checked
+    def logarithm(self, value, base=10):
+        """Logarithm; exact for integer powers of an integer base, else rounded."""
+        value, base = self.number(value), self.number(base)
+        if value <= 0:
+            raise ValueError("Logarithm is undefined for non-positive values.")
+        if base <= 0 or base == 1:
+            raise ValueError("Logarithm base must be positive and not 1.")
+        if type(value) is int and type(base) is int:
+            exponent = _exact_log(value, base)
+            if exponent is not None:
+                return exponent
+        value = self._to_decimal(value)
+        if base == 10:
+            return self._normalize(self.context.log10(value))
+        return self._normalize(self.context.divide(self.context.ln(value),
+                                                   self.context.ln(self._to_decimal(base))))
+
+    @staticmethod
+    def factorial(n):
+        """Exact factorial of a non-negative integer (memoized and size-limited)."""
+        if isinstance(n, (Decimal, Fraction, float)) and n == int(n):
+            n = int(n)
+        if not isinstance(n, int):
+            raise ValueError("Factorial is only defined for integers.")
+        if n < 0:
+            raise ValueError("Factorial is undefined for negative numbers.")
+        return AdvancedCalculator.factorial(n)
+
+
+def _exact_log(value, base):
+    """Return k if value == base ** k for an integer k >= 0, else None."""
+    exponent = 0
+    while value % base == 0:
+        value //= base
+        exponent += 1
+    return exponent if value == 1 else None
@@ -0,0 +1,425 @@
+"""
+Function tabulation for the calculator.
+
+Evaluates a function over a start/stop/step range or over an array of
+points, one chunk at a time, and streams the rows to a generator, a CSV
+file or a binary file without building the whole table in memory.
+
+With NumPy installed each chunk is evaluated in one vectorized call
+(through BatchCalculator), and sine/cosine over ranges are computed
+incrementally: the sines and cosines of the chunk offsets are built once,
+and every chunk is rotated from one exact sin/cos pair at its start, which
+costs two multiplications per point instead of a full evaluation. Without
+NumPy the scalar operations are mapped over each chunk.
+
+Functions: sin, cos, sincos (both columns in one pass), tan, cot, asin,
+acos, atan, sqrt, log (base 10), ln, factorial, a one-variable expression
+in x (see expression.py) or any callable.
+
+Angles can be given in radians, degrees or gradians; each chunk of points
+is converted as it is generated, and inverse functions return the same unit.
+
+Usage:
+    python tabulate.py sincos --start 0 --stop 360 --step 0.001 --unit degrees -o table.csv
+    python tabulate.py "sqrt(x) * ln(x)" --start 1 --stop 1e7 --format binary -o table.bin
+"""
+
+import argparse
+import math
+import sys
+from array import array
+from itertools import islice
+
+from expression import compile_expression
+from vectorized import BatchCalculator, SCALAR_OPERATIONS, np
+
+
+ANGLE_UNITS = {
+    'radians': 1.0,
+    'degrees': math.pi / 180,
+    'gradians': math.pi / 200
+}
+ERROR_MODES = ("raise", "nan")
+CHUNK_SIZE = 1 << 16
+
+# name -> (BatchCalculator method, extra arguments, angle role, columns)
+# angle role: "in" converts the input to radians, "out" converts the result
+FUNCTIONS = {
+    'sin': ('sine', (), "in", ('sin',)),
+    'cos': ('cosine', (), "in", ('cos',)),
+    'sincos': (None, (), "in", ('sin', 'cos')),
+    'tan': ('tangent', (), "in", ('tan',)),
+    'cot': ('cotangent', (), "in", ('cot',)),
+    'asin': ('asin', (), "out", ('asin',)),
+    'acos': ('acos', (), "out", ('acos',)),
+    'atan': ('atan', (), "out", ('atan',)),
+    'sqrt': ('square_root', (), None, ('sqrt',)),
+    'log': ('logarithm', (10,), None, ('log',)),
+    'ln': ('logarithm', (math.e,), None, ('ln',)),
+    'factorial': ('factorial', (), None, ('factorial',))
+}
+
+
+class Grid:
+    """Evenly spaced points start, start + step, ... below stop (like range)."""
+
+    __slots__ = ('start', 'stop', 'step', 'count')
+
+    def __init__(self, start, stop, step=1.0):
+        if step == 0:
+            raise ValueError("Step cannot be zero.")
+        if not all(math.isfinite(v) for v in (start, stop, step)):
+            raise ValueError("Start, stop and step must be finite.")
+        self.start = float(start)
+        self.stop = float(stop)
+        self.step = float(step)
+        self.count = max(0, math.ceil((self.stop - self.start) / self.step))
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        start, step = self.start, self.step
+        return (start + i * step for i in range(self.count))
+
+    def __repr__(self):
+        return f"Grid({self.start!r}, {self.stop!r}, {self.step!r})"
+
+
+class Tabulator:
+    """Evaluate functions over grids or arrays and stream the results."""
+
+    def __init__(self, unit="radians", errors="raise", use_numpy=None,
+                 chunk_size=CHUNK_SIZE):
+        """
+        Args:
+            unit: Angle unit: "radians", "degrees" or "gradians"
+            errors: Bad points (cot at 0, asin(2), ...) "raise" ValueError or
+                become "nan"
+            use_numpy: Force NumPy on (True) or off (False); by default it
+                is used when installed
+            chunk_size: Points evaluated per chunk (default: 65536)
+        """
+        if unit not in ANGLE_UNITS:
+            raise ValueError(f"unit must be one of {', '.join(ANGLE_UNITS)}.")
+        if errors not in ERROR_MODES:
+            raise ValueError(f"errors must be one of {', '.join(ERROR_MODES)}.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive.")
+        self.unit = unit
+        self.errors = errors
+        self.chunk_size = chunk_size
+        self.batch = BatchCalculator(errors="mask", use_numpy=use_numpy)
+        self.use_numpy = self.batch.use_numpy
+        self._rotation = None
+
+    def columns(self, function):
+        """Return the column names written for a function: ("x", ...)."""
+        if isinstance(function, str) and function in FUNCTIONS:
+            return ('x',) + FUNCTIONS[function][3]
+        return ('x', 'y')
+
+    # Points
+
+    def _point_chunks(self, points, factor):
+        """
+        Yield (x, argument) chunks, where argument is x converted to radians.
+
+        Grids are generated chunk by chunk; arrays are sliced.
+        """
+        size = self.chunk_size
+        if isinstance(points, Grid):
+            start, step = points.start, points.step
+            for first in range(0, points.count, size):
+                last = min(first + size, points.count)
+                if self.use_numpy:
+                    xs = np.arange(first, last, dtype=float)
+                    xs *= step
+                    xs += start
+                else:
+                    xs = array('d', [start + i * step for i in range(first, last)])
+                yield xs, self._scaled(xs, factor)
+            return
+
+        if self.use_numpy:
+            values = np.asarray(points, dtype=float) if hasattr(points, '__len__') \
+                else np.fromiter(points, float)
+            for first in range(0, len(values), size):
+                xs = values[first:first + size]
+                yield xs, self._scaled(xs, factor)
+            return
+
+        iterator = iter(points)
+        while True:
+            xs = array('d', islice(iterator, size))
+            if not xs:
+                return
+            yield xs, self._scaled(xs, factor)
+
+    def _scaled(self, values, factor):
+        if factor == 1.0:
+            return values
+        if self.use_numpy:
+            return values * factor
+        return array('d', map(factor.__mul__, values))
+
+    # Evaluation
+
+    def chunks(self, function, points):
+        """
+        Evaluate ``function`` over ``points`` chunk by chunk.
+
+        Args:
+            function: A name from FUNCTIONS, an expression in x or a callable
+            points: A Grid or a sequence/array/iterable of x values
+
+        Yields:
+            Tuples of columns (x, y, ...) as NumPy arrays or array('d')
+
+        Raises:
+            ValueError: For a bad point when errors="raise"
+        """
+        if isinstance(function, str) and function in FUNCTIONS:
+            method, extra, role, _ = FUNCTIONS[function]
+        else:
+            method, extra, role = _scalar_function(function), (), None
+
+        factor = ANGLE_UNITS[self.unit] if role == "in" else 1.0
+        rotate = (self.use_numpy and isinstance(points, Grid)
+                  and function in ('sin', 'cos', 'sincos'))
+        offset = 0
+        # The rotation converts its own angles
+        for xs, args in self._point_chunks(points, 1.0 if rotate else factor):
+            if rotate:
+                sines, cosines = self._rotate(points, offset, len(xs), factor)
+                offset += len(xs)
+                if function == 'sin':
+                    yield xs, sines
+                elif function == 'cos':
+                    yield xs, cosines
+                else:
+                    yield xs, sines, cosines
+                continue
+            if method is None:
+                yield (xs,) + self._sincos(args)
+                continue
+            if callable(method):
+                values = self._evaluate_scalar(method, xs, args)
+            else:
+                values = self._evaluate(method, function, extra, xs, args)
+            if role == "out" and self.unit != "radians":
+                values = self._scaled(values, 1 / ANGLE_UNITS[self.unit])
+            yield xs, values
+
+    def _sincos(self, args):
+        if self.use_numpy:
+            return np.sin(args), np.cos(args)
+        return array('d', map(math.sin, args)), array('d', map(math.cos, args))
+
+    def _rotate(self, grid, first, count, factor):
+        """
+        Sines and cosines of points first .. first + count - 1 of a grid.
+
+        sin(a + d) = sin a cos d + cos a sin d, with a the chunk's first angle
+        and d its offsets, whose sines and cosines are computed once per grid.
+        """
+        step = grid.step * factor
+        if self._rotation is None or self._rotation[0] != step:
+            offsets = np.arange(self.chunk_size, dtype=float) * step
+            self._rotation = (step, np.sin(offsets), np.cos(offsets))
+        _, sin_d, cos_d = self._rotation
+        sin_d, cos_d = sin_d[:count], cos_d[:count]
+
+        angle = (grid.start + first * grid.step) * factor
+        sin_a, cos_a = math.sin(angle), math.cos(angle)
+        sines = sin_d * cos_a
+        sines += cos_d * sin_a
+        cosines = cos_d * cos_a
+        cosines -= sin_d * sin_a
+        return sines, cosines
+
+    def _evaluate(self, method, function, extra, xs, args):
+        values, invalid = getattr(self.batch, method)(args, *extra)
+        if self.errors == "raise" and _any(invalid):
+            index = _first_true(invalid)
+            name = FUNCTIONS[function][0]
+            try:
+                SCALAR_OPERATIONS[name](args[index], *extra)
+            except (ValueError, ArithmeticError) as e:
+                raise ValueError(f"At x = {float(xs[index])!r}: {e}") from None
+            raise ValueError(f"At x = {float(xs[index])!r}: {function} is undefined.")
+        return values
+
+    def _evaluate_scalar(self, function, xs, args):
+        if self.use_numpy:
+            # Python floats raise on bad points where np.float64 warns
+            xs, args = xs.tolist(), args.tolist()
+        try:
+            values = array('d', map(function, args))
+        except (ValueError, ArithmeticError, TypeError):
+            # Slow path: only taken when some point is bad
+            values = array('d')
+            for x, arg in zip(xs, args):
+                try:
+                    values.append(function(arg))
+                except (ValueError, ArithmeticError, TypeError) as e:
+                    if self.errors == "raise":
+                        raise ValueError(f"At x = {x!r}: {e}") from None
+                    values.append(math.nan)
+        return np.frombuffer(values) if self.use_numpy else values
+
+    def rows(self, function, points):
+        """Yield (x, y, ...) tuples of floats, one per point."""
+        for columns in self.chunks(function, points):
+            if self.use_numpy:
+                columns = [column.tolist() for column in columns]
+            yield from zip(*columns)
+
+    def table(self, function, points):
+        """Return the whole table as a tuple of columns (x, y, ...)."""
+        parts = list(self.chunks(function, points))
+        width = len(self.columns(function))
+        if self.use_numpy:
+            if not parts:
+                return tuple(np.empty(0) for _ in range(width))
+            return tuple(np.concatenate([part[i] for part in parts]) for i in range(width))
+        columns = tuple(array('d') for _ in range(width))
+        for part in parts:
+            for column, values in zip(columns, part):
+                column.extend(values)
+        return columns
+
+    # Output
+
+    def write_csv(self, function, points, out, float_format="%r", header=True):
+        """
+        Write the table as CSV to a text stream, chunk by chunk.
+
+        Args:
+            float_format: printf-style format for each value (default: "%r",
+                the shortest text that reads back to the same float)
+            header: Write the column names first
+
+        Returns:
+            Number of rows written
+        """
+        names = self.columns(function)
+        if header:
+            out.write(",".join(names) + "\n")
+        line = ",".join([float_format] * len(names)) + "\n"
+        count = 0
+        for columns in self.chunks(function, points):
+            if self.use_numpy:
+                columns = [column.tolist() for column in columns]
+            out.write("".join(map(line.__mod__, zip(*columns))))
+            count += len(columns[0])
+        return count
+
+    def write_binary(self, function, points, out):
+        """
+        Write the table to a binary stream as little-endian float64 rows.
+
+        Each row holds the columns in order (x, y, ...); read it back with
+        ``numpy.fromfile(path, "<f8").reshape(-1, width)``.
+
+        Returns:
+            Number of rows written
+        """
+        count = 0
+        for columns in self.chunks(function, points):
+            rows = len(columns[0])
+            if self.use_numpy:
+                block = np.column_stack(columns).astype('<f8', copy=False)
+                out.write(block.tobytes())
+            else:
+                width = len(columns)
+                block = array('d', bytes(8 * rows * width))
+                for i, column in enumerate(columns):
+                    block[i::width] = column
+                if sys.byteorder == 'big':
+                    block.byteswap()
+                out.write(block.tobytes())
+            count += rows
+        return count
+
+
+def _any(mask):
+    if np is not None and isinstance(mask, np.ndarray):
+        return bool(mask.any())
+    return any(mask)
+
+
+def _first_true(mask):
+    if np is not None and isinstance(mask, np.ndarray):
+        return int(np.flatnonzero(mask)[0])
+    return next(i for i, bad in enumerate(mask) if bad)
+
+
+def _scalar_function(function):
+    """Return a one-argument callable for an expression in x or a callable."""
+    if callable(function):
+        return function
+    if not isinstance(function, str):
+        raise ValueError("Function must be a name, an expression or a callable.")
+    expression = compile_expression(function)
+    unknown = set(expression.variables) - {'x'}
+    if unknown:
+        raise ValueError(f"Expressions may only use the variable x, not "
+                         f"{', '.join(sorted(unknown))}.")
+    evaluate = expression.evaluate
+    return lambda x: evaluate({'x': x})
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Tabulate a function over a range.")
+    parser.add_argument("function",
+                        help=f"one of {', '.join(FUNCTIONS)}, or an expression in x")
+    parser.add_argument("--start", type=float, default=0.0, help="first x (default: 0)")
+    parser.add_argument("--stop", type=float, required=True, help="end of the range (excluded)")
+    parser.add_argument("--step", type=float, default=1.0, help="spacing (default: 1)")
+    parser.add_argument("--unit", choices=ANGLE_UNITS, default="radians",
+                        help="angle unit (default: radians)")
+    parser.add_argument("--errors", choices=ERROR_MODES, default="nan",
+                        help="stop at a bad point or write nan (default: nan)")
+    parser.add_argument("--format", choices=("csv", "binary"), default="csv",
+                        help="output format (default: csv)")
+    parser.add_argument("--float-format", default="%r",
+                        help='printf-style CSV value format, e.g. "%%.10g" (default: %%r)')
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--no-numpy", action="store_true", help="do not use NumPy")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="do not print the summary to stderr")
+    args = parser.parse_args(argv)
+
+    tabulator = Tabulator(args.unit, args.errors, False if args.no_numpy else None)
+    try:
+        grid = Grid(args.start, args.stop, args.step)
+    except ValueError as e:
+        parser.error(str(e))
+    buffer_size = 1024 * 1024
+    try:
+        if args.format == "binary":
+            out = sys.stdout.buffer if args.output == "-" else open(args.output, 'wb', buffer_size)
+            try:
+                count = tabulator.write_binary(args.function, grid, out)
+            finally:
+                if args.output != "-":
+                    out.close()
+        else:
+            out = sys.stdout if args.output == "-" else open(
+                args.output, 'w', encoding='utf-8', buffering=buffer_size)
+            try:
+                count = tabulator.write_csv(args.function, grid, out, args.float_format)
+            finally:
+                if args.output != "-":
+                    out.close()
+    except ValueError as e:
+        parser.exit(1, f"Error: {e}\n")
+
+    if not args.quiet:
+        sys.stderr.write(f"Points: {count}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Batch versions of the calculator operations.
+
+Every operation of Calculator, AdvancedCalculator and TrigonometricOperations
+is available over whole columns of values: lists, tuples, array.array or
+NumPy arrays. With NumPy installed the work is vectorized; without it the
+scalar operations are mapped over the inputs in a tight loop.
+
+Bad elements (division by zero, log of a non-positive value, asin out of
+range, ...) are handled element by element:
+
+    errors="raise"  raise ValueError naming the first bad element
+    errors="nan"    put NaN in place of the bad elements
+    errors="mask"   like "nan", but return (values, mask) where mask is
+                    true for the bad elements
+"""
+
+import math
+from array import array
+from itertools import repeat
+
+from basic_op import Calculator
+from higher_level_op import AdvancedCalculator, TrigonometricOperations
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+ERROR_MODES = ("raise", "nan", "mask")
+
+# Factorials that fit in a float; anything larger overflows to inf
+_MAX_FLOAT_FACTORIAL = 170
+_FACTORIALS = [float(math.factorial(n)) for n in range(_MAX_FLOAT_FACTORIAL + 1)]
+
+_calc = Calculator()
+
+
+def _real_power(a, b):
+    try:
+        result = _calc.power(a, b)
+    except (ZeroDivisionError, OverflowError):
+        raise ValueError("Power is undefined or too large for these values.")
+    if isinstance(result, complex):
+        raise ValueError("Power is undefined or too large for these values.")
+    return result
+
+
+def _float_factorial(n):
+    if n < 0:
+        raise ValueError("Factorial is undefined for negative numbers.")
+    if n != int(n):
+        raise ValueError("Factorial is only defined for integers.")
+    return _FACTORIALS[int(n)] if n <= _MAX_FLOAT_FACTORIAL else math.inf
+
+
+def _logarithm(value, base=10):
+    if base <= 0 or base == 1:
+        raise ValueError("Logarithm base must be positive and not 1.")
+    return AdvancedCalculator.logarithm(value, base)
+
+
+# Scalar version of every operation, used element by element without NumPy
+SCALAR_OPERATIONS = {
+    'add': _calc.add,
+    'subtract': _calc.subtract,
+    'multiply': _calc.multiply,
+    'divide': _calc.divide,
+    'power': _real_power,
+    'modulo': _calc.modulo,
+    'square_root': AdvancedCalculator.square_root,
+    'logarithm': _logarithm,
+    'factorial': _float_factorial,
+    'sine': TrigonometricOperations.sine,
+    'cosine': TrigonometricOperations.cosine,
+    'tangent': TrigonometricOperations.tangent,
+    'cotangent': TrigonometricOperations.cotangent,
+    'asin': TrigonometricOperations.asin,
+    'acos': TrigonometricOperations.acos,
+    'atan': TrigonometricOperations.atan
+}
+
+
+def _numpy_operations():
+    """
+    Vectorized version of every operation.
+
+    Each returns (result, [(invalid mask, message), ...]).
+    """
+    factorials = np.array(_FACTORIALS + [math.inf])
+
+    def divide(a, b):
+        return np.divide(a, b), [(b == 0, "Cannot divide by zero!")]
+
+    def modulo(a, b):
+        return np.mod(a, b), [(b == 0, "Cannot perform modulo with zero!")]
+
+    def power(a, b):
+        result = np.power(a, b)
+        invalid = ~np.isfinite(result) & np.isfinite(a) & np.isfinite(b)
+        return result, [(invalid, "Power is undefined or too large for these values.")]
+
+    def square_root(value):
+        return np.sqrt(value), [
+            (value < 0, "Cannot compute square root of a negative number.")]
+
+    def logarithm(value, base=10):
+        return np.log(value) / np.log(base), [
+            ((base <= 0) | (base == 1), "Logarithm base must be positive and not 1."),
+            (value <= 0, "Logarithm is undefined for non-positive values.")]
+
+    def factorial(n):
+        index = np.clip(np.nan_to_num(n, nan=0.0), 0, _MAX_FLOAT_FACTORIAL + 1)
+        return factorials[index.astype(np.intp)], [
+            (n < 0, "Factorial is undefined for negative numbers."),
+            (n != np.floor(n), "Factorial is only defined for integers.")]
+
+    def cotangent(angle):
+        tan_value = np.tan(angle)
+        return 1 / tan_value, [(tan_value == 0, "Cotangent is undefined for this angle.")]
+
+    def asin(value):
+        return np.arcsin(value), [
+            ((value < -1) | (value > 1), "Input for arcsine must be in the range [-1, 1].")]
+
+    def acos(value):
+        return np.arccos(value), [
+            ((value < -1) | (value > 1), "Input for arccosine must be in the range [-1, 1].")]
+
+    def plain(function):
+        return lambda *args: (function(*args), [])
+
+    return {
+        'add': plain(np.add),
+        'subtract': plain(np.subtract),
+        'multiply': plain(np.multiply),
+        'divide': divide,
+        'power': power,
+        'modulo': modulo,
+        'square_root': square_root,
+        'logarithm': logarithm,
+        'factorial': factorial,
+        'sine': plain(np.sin),
+        'cosine': plain(np.cos),
+        'tangent': plain(np.tan),
+        'cotangent': cotangent,
+        'asin': asin,
+        'acos': acos,
+        'atan': plain(np.arctan)
+    }
+
+
+def _is_scalar(value):
+    return isinstance(value, (int, float))
+
+
+class BatchCalculator:
+    """Calculator operations over whole sequences of values."""
+
+    def __init__(self, errors="raise", use_numpy=None):
+        """
+        Args:
+            errors: Default handling of bad elements: "raise", "nan" or "mask"
+            use_numpy: Force NumPy on (True) or off (False); by default it
+                is used when installed
+        """
+        self._check_mode(errors)
+        if use_numpy and np is None:
+            raise ValueError("NumPy is not installed.")
+        self.errors = errors
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        self._vectorized = _numpy_operations() if self.use_numpy else None
+
+    @staticmethod
+    def _check_mode(errors):
+        if errors not in ERROR_MODES:
+            raise ValueError(f"errors must be one of {', '.join(ERROR_MODES)}.")
+
+    def _apply(self, name, args, errors):
+        errors = errors or self.errors
+        self._check_mode(errors)
+        if self.use_numpy:
+            return self._apply_numpy(name, args, errors)
+        return self._apply_python(name, args, errors)
+
+    def _apply_numpy(self, name, args, errors):
+        arrays = [value if _is_scalar(value) else
+                  np.fromiter(value, float) if not hasattr(value, '__len__') else
+                  np.asarray(value, dtype=float)
+                  for value in args]
+        if not any(isinstance(value, np.ndarray) for value in arrays):
+            arrays[0] = np.asarray([arrays[0]], dtype=float)
+        with np.errstate(all='ignore'):
+            result, checks = self._vectorized[name](*arrays)
+            result = np.array(result, dtype=float, copy=True)
+        invalid = None
+        for mask, message in checks:
+            if not np.any(mask):
+                continue
+            mask = np.broadcast_to(mask, result.shape)
+            if errors == "raise":
+                index = int(np.flatnonzero(mask)[0])
+                raise ValueError(f"Element {index}: {message}")
+            invalid = mask if invalid is None else invalid | mask
+        if invalid is not None:
+            result[invalid] = np.nan
+        if errors == "mask":
+            if invalid is None:
+                invalid = np.zeros(result.shape, dtype=bool)
+            return result, invalid
+        return result
+
+    def _apply_python(self, name, args, errors):
+        function = SCALAR_OPERATIONS[name]
+        # Generators and other unsized iterables are read once, as np.fromiter does
+        args = [value if _is_scalar(value) or hasattr(value, '__len__') else list(value)
+                for value in args]
+        length = None
+        for value in args:
+            if not _is_scalar(value):
+                if length is not None and len(value) != length:
+                    raise ValueError("Inputs must all have the same length.")
+                length = len(value)
+        if length is None:
+            length = 1
+            args = [[args[0]]] + list(args[1:])
+        columns = [repeat(value, length) if _is_scalar(value) else value
+                   for value in args]
+
+        try:
+            result = array('d', map(function, *columns))
+            invalid = None
+        except (ValueError, ArithmeticError, TypeError):
+            # Slow path: only taken when some element is bad
+            columns = [repeat(value, length) if _is_scalar(value) else value
+                       for value in args]
+            result = array('d')
+            invalid = array('b')
+            for index, values in enumerate(zip(*columns)):
+                try:
+                    result.append(function(*values))
+                    invalid.append(0)
+                except (ValueError, ArithmeticError, TypeError) as e:
+                    if errors == "raise":
+                        raise ValueError(f"Element {index}: {e}") from None
+                    result.append(math.nan)
+                    invalid.append(1)
+
+        if errors == "mask":
+            return result, invalid if invalid is not None else array('b', bytes(length))
+        return result
+
+    # Basic operations
+
+    def add(self, a, b, errors=None):
+        """Add two columns (or a column and a number)."""
+        return self._apply('add', (a, b), errors)
+
+    def subtract(self, a, b, errors=None):
+        """Subtract b from a element-wise."""
+        return self._apply('subtract', (a, b), errors)
+
+    def multiply(self, a, b, errors=None):
+        """Multiply element-wise."""
+        return self._apply('multiply', (a, b), errors)
+
+    def divide(self, a, b, errors=None):
+        """Divide a by b element-wise; dividing by zero is an error."""
+        return self._apply('divide', (a, b), errors)
+
+    def power(self, a, b, errors=None):
+        """Raise a to the power of b element-wise; non-real or overflowing results are errors."""
+        return self._apply('power', (a, b), errors)
+
+    def modulo(self, a, b, errors=None):
+        """Remainder of a divided by b element-wise; modulo zero is an error."""
+        return self._apply('modulo', (a, b), errors)
+
+    # Advanced operations
+
+    def square_root(self, values, errors=None):
+        """Square root of each value; negative values are errors."""
+        return self._apply('square_root', (values,), errors)
+
+    def logarithm(self, values, base=10, errors=None):
+        """Logarithm of each value; non-positive values are errors."""
+        return self._apply('logarithm', (values, base), errors)
+
+    def factorial(self, values, errors=None):
+        """Factorial of each value as a float (inf above 170!)."""
+        return self._apply('factorial', (values,), errors)
+
+    # Trigonometric operations (radians)
+
+    def sine(self, angles, errors=None):
+        return self._apply('sine', (angles,), errors)
+
+    def cosine(self, angles, errors=None):
+        return self._apply('cosine', (angles,), errors)
+
+    def tangent(self, angles, errors=None):
+        return self._apply('tangent', (angles,), errors)
+
+    def cotangent(self, angles, errors=None):
+        """Cotangent of each angle; angles where it is undefined are errors."""
+        return self._apply('cotangent', (angles,), errors)
+
+    def asin(self, values, errors=None):
+        """Arcsine of each value; values outside [-1, 1] are errors."""
+        return self._apply('asin', (values,), errors)
+
+    def acos(self, values, errors=None):
+        """Arccosine of each value; values outside [-1, 1] are errors."""
+        return self._apply('acos', (values,), errors)
+
+    def atan(self, values, errors=None):
+        return self._apply('atan', (values,), errors)
@@ -0,0 +1,53 @@
+"""
+Password Strength Audit
+Stream a file of passwords (one per line) through the strength analyzer
+and report the score, entropy estimate and suggestions for each line.
+
+Usage:
+    python audit.py passwords.txt > report.tsv
+    cat passwords.txt | python audit.py --summary
+"""
+
+import argparse
+import sys
+from collections import Counter
+
+from breach_filter import BreachFilter
+from password_gen import PasswordGenerator
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Audit password strength in bulk.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="password file, one per line (default: stdin)")
+    parser.add_argument("--summary", action="store_true",
+                        help="only print totals per strength label")
+    parser.add_argument("--breach-filter",
+                        help="flag passwords found in this filter (see breach_filter.py)")
+    args = parser.parse_args(argv)
+
+    breach_filter = BreachFilter(args.breach_filter) if args.breach_filter else None
+    source = sys.stdin if args.input == "-" else open(args.input, 'r', errors='replace')
+    gen = PasswordGenerator(breach_filter)
+    totals = Counter()
+    out = sys.stdout
+    try:
+        passwords = (line.rstrip("\r\n") for line in source)
+        for line_no, report in enumerate(gen.calculate_strength_many(passwords), 1):
+            totals[report.strength] += 1
+            if not args.summary:
+                # The passwords themselves are never echoed
+                out.write(f"{line_no}\t{report.score}\t{report.strength}\t"
+                          f"{report.entropy:.1f}\t{'; '.join(report.suggestions)}\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    summary = out if args.summary else sys.stderr
+    for label in ("Breached", "Weak", "Medium", "Strong", "Very Strong"):
+        summary.write(f"{label}: {totals[label]}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Batch Password Generation
+Generate large numbers of passwords from the command line, spread across
+several processes and streamed to a file or stdout.
+
+Usage:
+    python batch.py --count 1000000 --length 16 --workers 8 --output passwords.txt
+    python batch.py --count 100000 --template "Cvcc-dddd-ssss"
+    python batch.py --count 10000 --wordlist eff_large_wordlist.txt --words 6
+"""
+
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from breach_filter import BreachFilter
+from password_gen import PasswordGenerator
+from templates import PassphrasePlan
+
+
+def _passwords(gen, count, options):
+    """Generate passwords for an option set (flat, template or passphrase)."""
+    options = dict(options)
+    template = options.pop("template", None)
+    wordlist = options.pop("wordlist", None)
+    if template is not None:
+        return gen.template(template).generate_many(count, gen.breach_filter)
+    if wordlist is not None:
+        plan = PassphrasePlan(wordlist, options.pop("words", 6))
+        return plan.generate_many(count, gen.breach_filter)
+    return gen.generate_many(count, **options)
+
+
+def _generate_chunk(count, options, filter_path=None):
+    """Generate ``count`` passwords in a worker and return them as text."""
+    breach_filter = BreachFilter(filter_path) if filter_path else None
+    try:
+        gen = PasswordGenerator(breach_filter)
+        return ''.join(password + "\n" for password in _passwords(gen, count, options))
+    finally:
+        if breach_filter is not None:
+            breach_filter.close()
+
+
+def _chunk_sizes(count, chunk_size):
+    """Split ``count`` into chunks of at most ``chunk_size``."""
+    while count > 0:
+        size = min(count, chunk_size)
+        yield size
+        count -= size
+
+
+def generate_chunks(count, workers=None, chunk_size=10000, ordered=True,
+                    filter_path=None, **options):
+    """
+    Generate passwords in parallel worker processes.
+
+    Every worker draws its randomness straight from the OS CSPRNG, so
+    there is no shared generator state. Only about two chunks per worker
+    are in flight at once, which keeps memory flat for any ``count``.
+
+    Args:
+        count: Total number of passwords
+        workers: Number of processes (default: number of CPUs)
+        chunk_size: Passwords generated per task
+        ordered: Yield chunks in submission order; False yields them as
+            soon as they finish
+        filter_path: Optional breach filter file; every worker maps it and
+            skips passwords found in it
+        **options: Options passed to ``PasswordGenerator.generate_many``,
+            or ``template`` for a template plan, or ``wordlist`` and
+            ``words`` for a passphrase plan
+
+    Yields:
+        Newline-terminated blocks of passwords
+    """
+    # Fail fast on invalid options instead of inside a worker
+    next(_passwords(PasswordGenerator(), 1, options))
+
+    workers = workers or os.cpu_count() or 1
+    sizes = _chunk_sizes(count, chunk_size)
+    if workers == 1:
+        for size in sizes:
+            yield _generate_chunk(size, options, filter_path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+
+        def submit_next():
+            size = next(sizes, None)
+            if size is not None:
+                pending.append(executor.submit(_generate_chunk, size, options,
+                                               filter_path))
+
+        for _ in range(workers * 2):
+            submit_next()
+
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+            yield future.result()
+            submit_next()
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Generate passwords in bulk.")
+    parser.add_argument("-n", "--count", type=int, required=True,
+                        help="number of passwords to generate")
+    parser.add_argument("-l", "--length", type=int, default=12,
+                        help="password length (default: 12)")
+    parser.add_argument("--no-uppercase", action="store_true",
+                        help="leave out uppercase letters")
+    parser.add_argument("--no-digits", action="store_true",
+                        help="leave out digits")
+    parser.add_argument("--no-special", action="store_true",
+                        help="leave out special characters")
+    parser.add_argument("--exclude-ambiguous", action="store_true",
+                        help="leave out ambiguous characters (0, O, l, 1)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=10000,
+                        help="passwords per worker task (default: 10000)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="write chunks as soon as they are ready")
+    parser.add_argument("-o", "--output", default="-",
+                        help="output file (default: stdout)")
+    parser.add_argument("--breach-filter",
+                        help="skip passwords found in this filter (see breach_filter.py)")
+    parser.add_argument("-t", "--template",
+                        help='generate from a template such as "Cvcc-dddd-ssss" (see templates.py)')
+    parser.add_argument("--wordlist",
+                        help="generate passphrases from this wordlist")
+    parser.add_argument("--words", type=int, default=6,
+                        help="words per passphrase (default: 6)")
+    args = parser.parse_args(argv)
+
+    if args.template and args.wordlist:
+        parser.error("--template and --wordlist cannot be combined")
+    if args.template:
+        options = {"template": args.template}
+    elif args.wordlist:
+        options = {"wordlist": args.wordlist, "words": args.words}
+    else:
+        options = {
+            "length": args.length,
+            "use_uppercase": not args.no_uppercase,
+            "use_digits": not args.no_digits,
+            "use_special": not args.no_special,
+            "exclude_ambiguous": args.exclude_ambiguous
+        }
+
+    out = sys.stdout if args.output == "-" else open(args.output, 'w')
+    try:
+        for chunk in generate_chunks(args.count, args.workers, args.chunk_size,
+                                     not args.unordered, args.breach_filter,
+                                     **options):
+            out.write(chunk)
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Breached Password Filter
+An offline Bloom filter of known-breached or common passwords.
+
+The filter file is memory-mapped, so opening it is instant no matter how
+many passwords it holds, and each lookup reads only a handful of bytes.
+Entries are SHA-1 digests, so the filter can be built from a plaintext
+list or from a SHA-1 hash list such as the "Pwned Passwords" download
+("HASH" or "HASH:count" per line).
+
+Usage:
+    python breach_filter.py build rockyou.txt breached.bloom --fp-rate 0.001
+    python breach_filter.py build pwned-passwords-sha1.txt breached.bloom --hashes
+    python breach_filter.py check breached.bloom < candidates.txt
+    python breach_filter.py check breached.bloom --show < candidates.txt
+"""
+
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import struct
+import sys
+
+
+MAGIC = b"PWBLOOM1"
+HEADER = struct.Struct("<8sQI4x")
+
+
+def password_digest(password):
+    """Return the SHA-1 digest the filter uses as the key for a password."""
+    return hashlib.sha1(password.encode("utf-8")).digest()
+
+
+def filter_parameters(expected, fp_rate):
+    """
+    Return the optimal (bit count, hash count) for a Bloom filter.
+
+    Args:
+        expected: Number of entries the filter will hold
+        fp_rate: Target false-positive rate, e.g. 0.001
+    """
+    if not 0 < fp_rate < 1:
+        raise ValueError("False-positive rate must be between 0 and 1!")
+    expected = max(expected, 1)
+    bits = math.ceil(-expected * math.log(fp_rate) / math.log(2) ** 2)
+    bits = max(bits, 64)
+    hashes = max(1, round(bits / expected * math.log(2)))
+    return bits, hashes
+
+
+def _bit_positions(digest, bits, hashes):
+    """Yield the bit positions of a digest (double hashing)."""
+    h1 = int.from_bytes(digest[0:8], "little")
+    h2 = int.from_bytes(digest[8:16], "little") | 1
+    for i in range(hashes):
+        yield (h1 + i * h2) % bits
+
+
+class BreachFilter:
+    """A read-only, memory-mapped Bloom filter of breached passwords."""
+
+    def __init__(self, filename):
+        """Open and memory-map a filter file built with ``build_filter``."""
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.bits, self.hashes = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{filename} is not a breach filter file!")
+
+    def __contains__(self, password):
+        """Return True if the password is (probably) in the filter."""
+        return self.contains_digest(password_digest(password))
+
+    def contains_digest(self, digest):
+        """Return True if a SHA-1 digest is (probably) in the filter."""
+        data = self._map
+        offset = HEADER.size
+        for position in _bit_positions(digest, self.bits, self.hashes):
+            if not data[offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def close(self):
+        """Unmap the filter file."""
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _iter_digests(lines, hashed):
+    """
+    Turn input lines (bytes) into SHA-1 digests, skipping blank lines.
+
+    Plaintext lines are hashed as raw bytes, so lists with lines that are
+    not valid UTF-8 build fine; for UTF-8 lines the digest is the same as
+    password_digest().
+    """
+    for line in lines:
+        line = line.rstrip(b"\r\n")
+        if not line:
+            continue
+        if hashed:
+            yield bytes.fromhex(line.split(b":", 1)[0].strip().decode("ascii"))
+        else:
+            yield hashlib.sha1(line).digest()
+
+
+def build_filter(input_filename, output_filename, fp_rate=0.001, hashed=False,
+                 expected=None):
+    """
+    Build a filter file from a plaintext or SHA-1 hash list.
+
+    The bit array is written through a memory map, so building does not
+    need the whole filter in RAM either.
+
+    Args:
+        input_filename: One password (or SHA-1 hex hash) per line
+        output_filename: Filter file to create
+        fp_rate: Target false-positive rate (default: 0.001)
+        hashed: Input lines are SHA-1 hashes, optionally "HASH:count"
+        expected: Number of entries; counted from the input if omitted
+
+    Returns:
+        The number of entries added
+    """
+    if expected is None:
+        with open(input_filename, 'rb') as f:
+            expected = sum(1 for line in f if line.strip(b"\r\n"))
+    bits, hashes = filter_parameters(expected, fp_rate)
+
+    try:
+        with open(output_filename, 'wb') as out:
+            out.write(HEADER.pack(MAGIC, bits, hashes))
+            out.truncate(HEADER.size + (bits + 7) // 8)
+
+        added = 0
+        offset = HEADER.size
+        with open(output_filename, 'r+b') as out, open(input_filename, 'rb') as f:
+            data = mmap.mmap(out.fileno(), 0)
+            try:
+                for digest in _iter_digests(f, hashed):
+                    for position in _bit_positions(digest, bits, hashes):
+                        data[offset + (position >> 3)] |= 1 << (position & 7)
+                    added += 1
+                data.flush()
+            finally:
+                data.close()
+    except BaseException:
+        # Do not leave a half-written filter behind
+        if os.path.exists(output_filename):
+            os.remove(output_filename)
+        raise
+    return added
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Offline breached-password filter.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="build a filter from a password list")
+    build.add_argument("input", help="plaintext passwords or SHA-1 hashes, one per line")
+    build.add_argument("output", help="filter file to create")
+    build.add_argument("--fp-rate", type=float, default=0.001,
+                       help="false-positive rate (default: 0.001)")
+    build.add_argument("--hashes", action="store_true",
+                       help="input holds SHA-1 hashes (HASH or HASH:count)")
+    build.add_argument("--expected", type=int,
+                       help="number of entries (default: count the input)")
+
+    check = commands.add_parser("check", help="check passwords read from stdin")
+    check.add_argument("filter", help="filter file")
+    check.add_argument("--show", action="store_true",
+                       help="also print each password (default: line number and status only)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        added = build_filter(args.input, args.output, args.fp_rate, args.hashes,
+                             args.expected)
+        size = os.path.getsize(args.output)
+        print(f"Added {added} entries, filter size {size / 1024 / 1024:.1f} MiB")
+    else:
+        with BreachFilter(args.filter) as breach_filter:
+            for line_no, line in enumerate(sys.stdin.buffer, 1):
+                password = line.rstrip(b"\r\n")
+                digest = hashlib.sha1(password).digest()
+                status = "BREACHED" if breach_filter.contains_digest(digest) else "ok"
+                # Passwords are only echoed when asked for, like audit.py
+                if args.show:
+                    print(f"{line_no}\t{status}\t{password.decode('utf-8', 'replace')}")
+                else:
+                    print(f"{line_no}\t{status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,20 +3,77 @@ Password Generator Application
 A secure password generator with customizable options.
 """
 
+import math
+import os
 import random
 import string
 import secrets
+from collections import namedtuple
+
+from breach_filter import BreachFilter
+from randomness import RandomIndexes, RandomStream
+from templates import PassphrasePlan, compile_template
+
+
+AMBIGUOUS_LOWER = "il1Lo0O"
+AMBIGUOUS_UPPER = "IO"
+AMBIGUOUS_DIGITS = "01"
+
+# Character class codes: lowercase, uppercase, digit, special, other
+CLASS_CODES = frozenset("ludso")
+
+StrengthReport = namedtuple("StrengthReport",
+                            "score strength entropy suggestions breached")
 
 
 class PasswordGenerator:
     """A secure password generator with various options."""
     
-    def __init__(self):
-        """Initialize character sets for password generation."""
+    def __init__(self, breach_filter=None):
+        """
+        Initialize character sets for password generation.
+        
+        Args:
+            breach_filter: Optional BreachFilter (see breach_filter.py) of
+                known-breached passwords. Generated passwords found in it
+                are drawn again, and checked ones are rated "Breached".
+        """
+        self.breach_filter = breach_filter
         self.lowercase = string.ascii_lowercase
         self.uppercase = string.ascii_uppercase
         self.digits = string.digits
         self.special = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+        self._pool_cache = {}
+        self._class_special = None
+    
+    def _pools(self, use_uppercase, use_digits, use_special, exclude_ambiguous):
+        """
+        Return the character pools for an option set, built once and cached.
+        
+        Returns:
+            A tuple of (required category pools, combined pool)
+        """
+        key = (use_uppercase, use_digits, use_special, exclude_ambiguous)
+        pools = self._pool_cache.get(key)
+        if pools is not None:
+            return pools
+        
+        def allowed(chars, ambiguous):
+            if exclude_ambiguous:
+                return ''.join(c for c in chars if c not in ambiguous)
+            return chars
+        
+        categories = [allowed(self.lowercase, AMBIGUOUS_LOWER)]
+        if use_uppercase:
+            categories.append(allowed(self.uppercase, AMBIGUOUS_UPPER))
+        if use_digits:
+            categories.append(allowed(self.digits, AMBIGUOUS_DIGITS))
+        if use_special:
+            categories.append(self.special)
+        
+        pools = (tuple(categories), ''.join(categories))
+        self._pool_cache[key] = pools
+        return pools
     
     def generate(self, length=12, use_uppercase=True, use_digits=True, 
                  use_special=True, exclude_ambiguous=False):
@@ -36,64 +93,94 @@ class PasswordGenerator:
         if length < 4:
             raise ValueError("Password length must be at least 4 characters!")
         
-        # Build character pool
-        chars = self.lowercase
+        categories, chars = self._pools(use_uppercase, use_digits, use_special,
+                                        exclude_ambiguous)
+        if not chars:
+            raise ValueError("No characters available for password generation!")
         
-        if exclude_ambiguous:
-            ambiguous = "il1Lo0O"
-            chars = ''.join(c for c in chars if c not in ambiguous)
+        rng = random.SystemRandom()
+        while True:
+            # Add at least one character from each selected category
+            password = [secrets.choice(pool) for pool in categories]
+            
+            # Fill the rest randomly
+            remaining_length = length - len(password)
+            password.extend(secrets.choice(chars) for _ in range(remaining_length))
+            
+            # Shuffle securely to avoid predictable patterns
+            # Use secrets.SystemRandom for cryptographically secure shuffle
+            rng.shuffle(password)
+            
+            password = ''.join(password)
+            # Never hand out a known-breached password
+            if self.breach_filter is None or password not in self.breach_filter:
+                return password
+    
+    def generate_many(self, count, length=12, use_uppercase=True, use_digits=True,
+                      use_special=True, exclude_ambiguous=False):
+        """
+        Generate many passwords efficiently.
         
-        if use_uppercase:
-            upper = self.uppercase
-            if exclude_ambiguous:
-                upper = ''.join(c for c in upper if c not in "IO")
-            chars += upper
+        Takes the same options as ``generate`` and gives the same
+        guarantees: characters come from the OS CSPRNG without modulo bias,
+        and every selected category appears at least once, at a uniformly
+        random position. Pools are built once and randomness is drawn in
+        large buffers, so this is much faster than calling ``generate`` in
+        a loop.
         
-        if use_digits:
-            digits = self.digits
-            if exclude_ambiguous:
-                digits = ''.join(c for c in digits if c not in "01")
-            chars += digits
+        Args:
+            count: Number of passwords to generate
         
-        if use_special:
-            chars += self.special
+        Yields:
+            Password strings
+        """
+        if length < 4:
+            raise ValueError("Password length must be at least 4 characters!")
         
+        categories, chars = self._pools(use_uppercase, use_digits, use_special,
+                                        exclude_ambiguous)
         if not chars:
             raise ValueError("No characters available for password generation!")
         
-        # Generate password ensuring at least one character from each selected category
-        password = []
+        required = len(categories)
+        fill_length = length - required
+        fill = RandomStream(chars)
+        picks = [RandomStream(pool, 4 * 1024) for pool in categories]
+        positions = RandomIndexes(length)
+        breach_filter = self.breach_filter
         
-        # Prepare character pools with ambiguous filtering
-        lower_pool = self.lowercase
-        if exclude_ambiguous:
-            lower_pool = ''.join(c for c in lower_pool if c not in "il1Lo0O")
-        
-        # Add at least one character from each category
-        password.append(secrets.choice(lower_pool))
-        if use_uppercase:
-            upper_pool = self.uppercase
-            if exclude_ambiguous:
-                upper_pool = ''.join(c for c in upper_pool if c not in "IO")
-            password.append(secrets.choice(upper_pool))
-        if use_digits:
-            digit_pool = self.digits
-            if exclude_ambiguous:
-                digit_pool = ''.join(c for c in digit_pool if c not in "01")
-            password.append(secrets.choice(digit_pool))
-        if use_special:
-            password.append(secrets.choice(self.special))
-        
-        # Fill the rest randomly
-        remaining_length = length - len(password)
-        password.extend(secrets.choice(chars) for _ in range(remaining_length))
-        
-        # Shuffle securely to avoid predictable patterns
-        # Use secrets.SystemRandom for cryptographically secure shuffle
-        rng = random.SystemRandom()
-        rng.shuffle(password)
-        
-        return ''.join(password)
+        produced = 0
+        while produced < count:
+            # Placing the required characters at distinct random positions
+            # among the fill characters is the same as shuffling them all
+            placed = {}
+            for stream in picks:
+                while True:
+                    position = positions.take(1)[0]
+                    if position not in placed:
+                        break
+                placed[position] = stream.take(1)
+            
+            password = bytearray(fill.take(fill_length))
+            for position in sorted(placed):
+                password[position:position] = placed[position]
+            password = password.decode("ascii")
+            if breach_filter is not None and password in breach_filter:
+                continue
+            produced += 1
+            yield password
+    
+    def template(self, template):
+        """
+        Compile a password template such as "Cvcc-dddd-ssss" into a plan.
+
+        See templates.py for the template characters. Plans are cached, so
+        compiling the same template again is free.
+
+        Returns:
+            TemplatePlan with ``generate``, ``generate_many`` and ``entropy``
+        """
+        return compile_template(template, self.special)
     
     def calculate_strength(self, password):
         """
@@ -102,25 +189,41 @@ class PasswordGenerator:
         Returns:
             A tuple of (score, strength_label)
         """
-        score = 0
-        
-        # Length check
-        if len(password) >= 8:
-            score += 1
-        if len(password) >= 12:
-            score += 1
-        if len(password) >= 16:
-            score += 1
-        
-        # Character variety check
-        if any(c.islower() for c in password):
-            score += 1
-        if any(c.isupper() for c in password):
-            score += 1
-        if any(c.isdigit() for c in password):
-            score += 1
-        if any(c in self.special for c in password):
-            score += 1
+        report = self.analyze(password)
+        return report.score, report.strength
+    
+    def analyze(self, password):
+        """
+        Analyze a password in a single pass over its characters.
+        
+        Returns:
+            A StrengthReport with the 0-7 score, its label, an entropy
+            estimate in bits, a list of suggestions and whether the
+            password is in the breach filter. Breached passwords score 0.
+        """
+        if self._class_special != self.special:
+            self._build_class_table()
+        
+        length = len(password)
+        classes = set(password.translate(self._class_table))
+        if not password.isascii():
+            # Only non-ASCII characters are left untranslated
+            for c in classes - CLASS_CODES:
+                if c.islower():
+                    classes.add('l')
+                if c.isupper():
+                    classes.add('u')
+                if c.isdigit():
+                    classes.add('d')
+                classes.add('o')
+        
+        score = (length >= 8) + (length >= 12) + (length >= 16)
+        pool_size = 0
+        for code in CLASS_CODES:
+            if code in classes:
+                if code != 'o':
+                    score += 1
+                pool_size += self._class_sizes[code]
         
         # Determine strength label
         if score <= 2:
@@ -132,12 +235,73 @@ class PasswordGenerator:
         else:
             strength = "Very Strong"
         
-        return score, strength
-
+        suggestions = []
+        if length < 12:
+            suggestions.append("Use at least 12 characters")
+        if 'u' not in classes:
+            suggestions.append("Add uppercase letters")
+        if 'd' not in classes:
+            suggestions.append("Add digits")
+        if 's' not in classes:
+            suggestions.append("Add special characters")
+        
+        entropy = length * math.log2(pool_size) if pool_size else 0.0
+        
+        breached = self.breach_filter is not None and password in self.breach_filter
+        if breached:
+            score = 0
+            strength = "Breached"
+            suggestions.insert(0, "This password is in a breach list, never use it")
+        return StrengthReport(score, strength, entropy, suggestions, breached)
+    
+    def calculate_strength_many(self, passwords):
+        """
+        Analyze many passwords, e.g. the lines of a large credential dump.
+        
+        Args:
+            passwords: Any iterable of password strings
+        
+        Yields:
+            A StrengthReport per password, in input order
+        """
+        analyze = self.analyze
+        for password in passwords:
+            yield analyze(password)
+    
+    def _build_class_table(self):
+        """Map every ASCII character to its class code for str.translate."""
+        table = {}
+        for i in range(128):
+            c = chr(i)
+            if c in self.special:
+                table[i] = 's'
+            elif c.islower():
+                table[i] = 'l'
+            elif c.isupper():
+                table[i] = 'u'
+            elif c.isdigit():
+                table[i] = 'd'
+            else:
+                table[i] = 'o'
+        self._class_table = table
+        self._class_special = self.special
+        
+        # Approximate alphabet size behind each class, for the entropy estimate
+        printable = set(string.printable) - set(string.whitespace) | {' '}
+        self._class_sizes = {
+            'l': len(self.lowercase),
+            'u': len(self.uppercase),
+            'd': len(self.digits),
+            's': len(self.special),
+            'o': max(len(printable - set(self.lowercase + self.uppercase
+                                         + self.digits + self.special)), 1)
+        }
 
 def main():
     """Main function to run the password generator."""
-    gen = PasswordGenerator()
+    # Optional offline breach check, see breach_filter.py
+    filter_path = os.getenv('PASSWORD_BREACH_FILTER')
+    gen = PasswordGenerator(BreachFilter(filter_path) if filter_path else None)
     
     print("=" * 60)
     print("Secure Password Generator".center(60))
@@ -148,11 +312,13 @@ def main():
         print("1. Generate Password")
         print("2. Generate Multiple Passwords")
         print("3. Check Password Strength")
-        print("4. Exit")
+        print("4. Generate From Template")
+        print("5. Generate Passphrase")
+        print("6. Exit")
         
-        choice = input("\nSelect option (1-4): ").strip()
+        choice = input("\nSelect option (1-6): ").strip()
         
-        if choice == '4':
+        if choice == '6':
             print("Stay secure!")
             break
         
@@ -184,8 +350,7 @@ def main():
                 print("Generated Passwords:".center(60))
                 print("=" * 60)
                 
-                for i in range(count):
-                    password = gen.generate(length)
+                for i, password in enumerate(gen.generate_many(count, length)):
                     score, strength = gen.calculate_strength(password)
                     print(f"{i+1}. {password} [{strength}]")
                 
@@ -197,18 +362,51 @@ def main():
         elif choice == '3':
             password = input("Enter password to check: ").strip()
             if password:
-                score, strength = gen.calculate_strength(password)
-                print(f"\nPassword Strength: {strength} (Score: {score}/7)")
+                report = gen.analyze(password)
+                print(f"\nPassword Strength: {report.strength} (Score: {report.score}/7)")
+                print(f"Estimated Entropy: {report.entropy:.1f} bits")
                 
                 print("\nSuggestions:")
-                if len(password) < 12:
-                    print("- Use at least 12 characters")
-                if not any(c.isupper() for c in password):
-                    print("- Add uppercase letters")
-                if not any(c.isdigit() for c in password):
-                    print("- Add digits")
-                if not any(c in gen.special for c in password):
-                    print("- Add special characters")
+                for suggestion in report.suggestions:
+                    print(f"- {suggestion}")
+        
+        elif choice == '4':
+            try:
+                template = input("Template (e.g. Cvcc-dddd-ssss): ").strip()
+                count = int(input("How many passwords? [5]: ") or "5")
+                plan = gen.template(template)
+                
+                print("\n" + "=" * 60)
+                print(f"Template Entropy: {plan.entropy:.1f} bits".center(60))
+                print("=" * 60)
+                
+                for i, password in enumerate(plan.generate_many(count, gen.breach_filter)):
+                    print(f"{i+1}. {password}")
+                
+                print("=" * 60)
+                
+            except ValueError as e:
+                print(f"Error: {e}")
+        
+        elif choice == '5':
+            try:
+                default_wordlist = os.getenv('PASSWORD_WORDLIST', '')
+                wordlist = input(f"Wordlist file [{default_wordlist}]: ").strip() or default_wordlist
+                words = int(input("Number of words [6]: ") or "6")
+                count = int(input("How many passphrases? [5]: ") or "5")
+                plan = PassphrasePlan(wordlist, words)
+                
+                print("\n" + "=" * 60)
+                print(f"Passphrase Entropy: {plan.entropy:.1f} bits".center(60))
+                print("=" * 60)
+                
+                for i, phrase in enumerate(plan.generate_many(count, gen.breach_filter)):
+                    print(f"{i+1}. {phrase}")
+                
+                print("=" * 60)
+                
+            except (ValueError, OSError) as e:
+                print(f"Error: {e}")
         
         else:
             print("Invalid choice! Please try again.")
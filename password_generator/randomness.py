@@ -0,0 +1,86 @@
+"""
+Buffered Randomness
+Unbiased random values drawn from large os.urandom buffers, shared by the
+bulk password, template and passphrase generators.
+"""
+
+import os
+
+
+class RandomStream:
+    """
+    Unbiased random characters from a pool, cut from large os.urandom buffers.
+
+    Bytes that would bias the result (those at or above the largest
+    multiple of the pool size) are rejected, and the rest are mapped to
+    pool characters, all inside ``bytes.translate``.
+    """
+
+    def __init__(self, pool, buffer_size=64 * 1024):
+        """
+        Args:
+            pool: Up to 256 distinct ASCII characters, or a bytes object
+                with up to 256 byte values
+            buffer_size: Number of random bytes fetched per refill
+        """
+        if isinstance(pool, str):
+            pool = pool.encode("ascii")
+        n = len(pool)
+        if not 0 < n <= 256:
+            raise ValueError("Pool must hold between 1 and 256 entries!")
+        limit = 256 - 256 % n
+        self._table = bytes(pool[b % n] if b < limit else 0 for b in range(256))
+        self._reject = bytes(range(limit, 256))
+        self._buffer_size = buffer_size
+        self._data = b""
+        self._pos = 0
+
+    def take(self, count):
+        """Return ``count`` random pool entries as bytes."""
+        while len(self._data) - self._pos < count:
+            fresh = os.urandom(max(self._buffer_size, count * 2))
+            self._data = (self._data[self._pos:]
+                          + fresh.translate(self._table, self._reject))
+            self._pos = 0
+        start = self._pos
+        self._pos += count
+        return self._data[start:self._pos]
+
+
+class RandomIndexes:
+    """Unbiased random integers in ``range(n)`` for any ``n``."""
+
+    def __init__(self, n, buffer_size=64 * 1024):
+        """
+        Args:
+            n: Exclusive upper bound, at least 1
+            buffer_size: Number of random bytes fetched per refill
+        """
+        if n < 1:
+            raise ValueError("Upper bound must be at least 1!")
+        self.n = n
+        self._small = RandomStream(bytes(range(n)), buffer_size) if n <= 256 else None
+        self._width = (n.bit_length() + 7) // 8
+        # Values at or above the largest multiple of n would bias the result
+        span = 1 << (8 * self._width)
+        self._limit = span - span % n
+        self._buffer_size = buffer_size
+        self._data = b""
+        self._pos = 0
+
+    def take(self, count):
+        """Return a list of ``count`` random indexes."""
+        if self._small is not None:
+            return list(self._small.take(count))
+
+        n, width, limit = self.n, self._width, self._limit
+        result = []
+        while len(result) < count:
+            if len(self._data) - self._pos < width:
+                self._data = os.urandom(self._buffer_size - self._buffer_size % width)
+                self._pos = 0
+            value = int.from_bytes(self._data[self._pos:self._pos + width], "little")
+            self._pos += width
+            if value < limit:
+                result.append(value % n)
+        return result
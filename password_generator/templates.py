@@ -0,0 +1,245 @@
+"""
+Template and Passphrase Generation
+Generate passwords from patterns such as "Cvcc-dddd-ssss" and diceware-style
+passphrases from a local wordlist.
+
+Each template or wordlist is compiled once into a plan. Generating from a
+plan only picks entries out of precomputed tables using buffered,
+unbiased randomness, and every plan reports its exact entropy.
+
+Template characters:
+    c / C   lowercase / uppercase consonant
+    v / V   lowercase / uppercase vowel
+    l / u   lowercase / uppercase letter
+    a       letter of either case
+    d       digit
+    s       special character
+    x       any letter, digit or special character
+    \\X      the literal character X
+Any other character is copied as-is.
+"""
+
+import math
+import mmap
+import string
+from array import array
+from functools import lru_cache
+
+from randomness import RandomIndexes, RandomStream
+
+
+DEFAULT_SPECIAL = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+VOWELS = "aeiou"
+CONSONANTS = ''.join(c for c in string.ascii_lowercase if c not in VOWELS)
+
+
+def _template_pools(special):
+    """Return the character pool for each template code."""
+    letters = string.ascii_letters
+    return {
+        'c': CONSONANTS,
+        'C': CONSONANTS.upper(),
+        'v': VOWELS,
+        'V': VOWELS.upper(),
+        'l': string.ascii_lowercase,
+        'u': string.ascii_uppercase,
+        'a': letters,
+        'd': string.digits,
+        's': special,
+        'x': letters + string.digits + special
+    }
+
+
+class TemplatePlan:
+    """A compiled password template."""
+
+    def __init__(self, template, special=DEFAULT_SPECIAL):
+        """
+        Compile a template.
+
+        Args:
+            template: Pattern such as "Cvcc-dddd-ssss" (see module docstring)
+            special: Characters used for "s" and "x"
+
+        Raises:
+            ValueError: If the template is empty or not ASCII
+        """
+        if not template:
+            raise ValueError("Template cannot be empty!")
+        if not template.isascii():
+            raise ValueError("Templates may only contain ASCII characters!")
+        pools = _template_pools(special)
+
+        # One entry per output position: a pool string or a literal character
+        self.template = template
+        self.positions = []
+        escaped = False
+        for c in template:
+            if escaped:
+                self.positions.append((None, c))
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c in pools:
+                self.positions.append((pools[c], None))
+            else:
+                self.positions.append((None, c))
+        if escaped:
+            self.positions.append((None, "\\"))
+
+        self.entropy = sum(math.log2(len(pool)) for pool, _ in self.positions if pool)
+        self._streams = {pool: RandomStream(pool)
+                         for pool, _ in self.positions if pool}
+
+    def generate(self):
+        """Generate one password from the template."""
+        return next(self.generate_many(1))
+
+    def generate_many(self, count, breach_filter=None, batch_size=4096):
+        """
+        Generate passwords from the template.
+
+        Random characters are drawn a whole batch at a time, one column per
+        template position, and then zipped into passwords.
+
+        Args:
+            count: Number of passwords
+            breach_filter: Optional BreachFilter; passwords found in it are
+                skipped and replaced
+            batch_size: Passwords built per batch
+
+        Yields:
+            Password strings
+        """
+        produced = 0
+        while produced < count:
+            size = min(batch_size, count - produced)
+            columns = [
+                self._streams[pool].take(size) if pool else literal.encode() * size
+                for pool, literal in self.positions
+            ]
+            for row in zip(*columns):
+                password = bytes(row).decode("ascii")
+                if breach_filter is not None and password in breach_filter:
+                    continue
+                produced += 1
+                yield password
+
+
+@lru_cache(maxsize=128)
+def compile_template(template, special=DEFAULT_SPECIAL):
+    """Return the cached TemplatePlan for a template."""
+    return TemplatePlan(template, special)
+
+
+class Wordlist:
+    """
+    A word file indexed for uniform random access.
+
+    Accepts plain lists (one word per line) and diceware lists
+    ("11111<TAB>word"), where the last field of each line is the word.
+    The file is only read and indexed on first use, then accessed
+    through a memory map. Duplicate words are dropped so every word is
+    equally likely.
+    """
+
+    def __init__(self, filename):
+        """Remember the word file; nothing is read yet."""
+        self.filename = filename
+        self._map = None
+        self._starts = None
+        self._lengths = None
+
+    def _index(self):
+        """Map the file and record where each unique word starts."""
+        with open(self.filename, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        starts = array('Q')
+        lengths = array('I')
+        seen = set()
+        pos = 0
+        size = len(data)
+        while pos < size:
+            end = data.find(b"\n", pos)
+            if end == -1:
+                end = size
+            fields = data[pos:end].split()
+            if fields:
+                word = fields[-1]
+                if word not in seen:
+                    seen.add(word)
+                    starts.append(pos + data[pos:end].rfind(word))
+                    lengths.append(len(word))
+            pos = end + 1
+        if not starts:
+            data.close()
+            raise ValueError(f"Wordlist {self.filename} has no words!")
+        self._map, self._starts, self._lengths = data, starts, lengths
+
+    def __len__(self):
+        if self._starts is None:
+            self._index()
+        return len(self._starts)
+
+    def __getitem__(self, i):
+        if self._starts is None:
+            self._index()
+        start = self._starts[i]
+        return self._map[start:start + self._lengths[i]].decode("utf-8")
+
+
+class PassphrasePlan:
+    """A compiled passphrase recipe: N words from a wordlist."""
+
+    def __init__(self, wordlist, words=6, separator=" ", capitalize=False):
+        """
+        Args:
+            wordlist: A Wordlist (or path to one)
+            words: Number of words per passphrase (default: 6)
+            separator: Text between words (default: space)
+            capitalize: Capitalize every word (default: False)
+        """
+        if words < 1:
+            raise ValueError("A passphrase needs at least one word!")
+        if isinstance(wordlist, str):
+            wordlist = Wordlist(wordlist)
+        self.wordlist = wordlist
+        self.words = words
+        self.separator = separator
+        self.capitalize = capitalize
+        self._indexes = None
+
+    @property
+    def entropy(self):
+        """Exact entropy in bits (words are drawn uniformly and independently)."""
+        return self.words * math.log2(len(self.wordlist))
+
+    def generate(self):
+        """Generate one passphrase."""
+        return next(self.generate_many(1))
+
+    def generate_many(self, count, breach_filter=None):
+        """
+        Generate passphrases.
+
+        Args:
+            count: Number of passphrases
+            breach_filter: Optional BreachFilter; phrases found in it are
+                skipped and replaced
+
+        Yields:
+            Passphrase strings
+        """
+        if self._indexes is None:
+            self._indexes = RandomIndexes(len(self.wordlist))
+        wordlist = self.wordlist
+        produced = 0
+        while produced < count:
+            words = [wordlist[i] for i in self._indexes.take(self.words)]
+            if self.capitalize:
+                words = [word.capitalize() for word in words]
+            phrase = self.separator.join(words)
+            if breach_filter is not None and phrase in breach_filter:
+                continue
+            produced += 1
+            yield phrase
@@ -0,0 +1,134 @@
+"""
+Memory benchmark for task storage.
+
+Compares the memory used by tasks kept as JSON-style dicts with the
+slotted ``Task`` records used by ``TodoList``, both as Python heap
+(tracemalloc) and as resident memory (RSS) of a fresh process loading the
+same task file.
+
+Usage:
+    python bench_memory.py [number_of_tasks]
+"""
+
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+from storage import JSONStorage
+from task import Task
+
+
+def build_json(count):
+    """Return a JSON task file body with ``count`` tasks."""
+    priorities = ["high", "medium", "low"]
+    return json.dumps([
+        {
+            "id": i,
+            "description": f"Task number {i}",
+            "priority": priorities[i % 3],
+            "completed": i % 4 == 0,
+            "created_at": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d} "
+                          f"{i % 24:02d}:{i % 60:02d}:{i % 60:02d}"
+        }
+        for i in range(1, count + 1)
+    ])
+
+
+def measure(label, build):
+    """
+    Print the memory still held by the object that ``build`` returns.
+
+    Returns:
+        A (result, bytes) tuple
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<14} {current / 1024 / 1024:10.1f} MiB "
+          f"{current / len(result):8.0f} bytes/task")
+    return result, current
+
+
+def rss_bytes():
+    """
+    Return the resident memory of this process in bytes.
+
+    Uses /proc on Linux; elsewhere falls back to the peak RSS, which is
+    still an upper bound for the growth measured in a fresh process.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def load_in_child(kind, filename):
+    """Print the RSS growth from loading ``filename`` as dicts or Task records."""
+    gc.collect()
+    before = rss_bytes()
+    if kind == "dicts":
+        with open(filename) as f:
+            tasks = json.load(f)
+    else:
+        tasks = JSONStorage(filename).load()
+    gc.collect()
+    print(rss_bytes() - before, len(tasks))
+
+
+def measure_rss(label, kind, filename):
+    """Load the task file in a fresh process and print its RSS growth."""
+    output = subprocess.run([sys.executable, __file__, "--child", kind, filename],
+                            check=True, capture_output=True, text=True).stdout
+    grown, count = map(int, output.split())
+    print(f"{label:<14} {grown / 1024 / 1024:10.1f} MiB "
+          f"{grown / count:8.0f} bytes/task")
+    return grown
+
+
+def main():
+    """Run the benchmark."""
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        load_in_child(sys.argv[2], sys.argv[3])
+        return
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    text = build_json(count)
+    print(f"{count} tasks")
+
+    dicts, dict_bytes = measure("dicts", lambda: json.loads(text))
+    records, record_bytes = measure(
+        "Task records", lambda: [Task.from_dict(data) for data in json.loads(text)])
+
+    # The descriptions are the payload and cost the same either way
+    text_bytes = sum(sys.getsizeof(task.description) for task in records)
+    print(f"{dict_bytes / record_bytes:.1f}x less memory overall, "
+          f"{(dict_bytes - text_bytes) / (record_bytes - text_bytes):.1f}x "
+          f"less per-task overhead (excluding description text)")
+
+    # The conversion must be lossless in both directions
+    assert [task.to_dict() for task in records] == dicts
+    del dicts, records
+
+    print("Resident memory after loading the task file (RSS):")
+    fd, filename = tempfile.mkstemp(suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        dict_rss = measure_rss("dicts", "dicts", filename)
+        record_rss = measure_rss("Task records", "records", filename)
+    finally:
+        os.remove(filename)
+    print(f"{dict_rss / record_rss:.1f}x less resident memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Search index for the To-Do List application.
+
+Keeps an inverted index from description tokens to task ids and a sorted
+index of creation times, both updated incrementally as tasks come and go.
+Substring queries are answered through a trigram index over the token
+vocabulary, so they only look at tokens that can contain the query.
+"""
+
+import re
+from bisect import bisect_left, bisect_right, insort
+
+
+_TOKEN = re.compile(r"\w+")
+_GRAM = 3
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens."""
+    return _TOKEN.findall(text.lower())
+
+
+def _grams(token):
+    """Return the distinct trigrams of a token (none if it is shorter)."""
+    return {token[i:i + _GRAM] for i in range(len(token) - _GRAM + 1)}
+
+
+class SearchIndex:
+    """Inverted token index plus a sorted created_at index over tasks."""
+
+    def __init__(self, tasks=()):
+        """Build the index from an iterable of tasks."""
+        self._postings = {}
+        # Trigram -> list of vocabulary tokens containing it. Tokens that
+        # leave the vocabulary stay listed (in _stale) until the next rebuild,
+        # which keeps removal cheap and the lists compact.
+        self._grams = {}
+        self._stale = set()
+        self._created = []
+        for task in tasks:
+            self._add_tokens(task)
+            self._created.append((task.created_at, task.id))
+        self._created.sort()
+
+    def add(self, task):
+        """Index a task."""
+        self._add_tokens(task)
+        key = (task.created_at, task.id)
+        if not self._created or key > self._created[-1]:
+            # New tasks are almost always the newest ones
+            self._created.append(key)
+        else:
+            insort(self._created, key)
+
+    def _add_tokens(self, task):
+        task_id = task.id
+        postings = self._postings
+        for token in set(tokenize(task.description)):
+            ids = postings.get(token)
+            if ids is None:
+                postings[token] = {task_id}
+                self._add_vocabulary(token)
+            else:
+                ids.add(task_id)
+
+    def _add_vocabulary(self, token):
+        """Add a token that just entered the vocabulary to the trigram index."""
+        if token in self._stale:
+            # Still listed from before it was removed
+            self._stale.discard(token)
+        elif len(token) >= _GRAM:
+            grams = self._grams
+            for gram in _grams(token):
+                tokens = grams.get(gram)
+                if tokens is None:
+                    grams[gram] = [token]
+                else:
+                    tokens.append(token)
+
+    def _rebuild_grams(self):
+        """Rebuild the trigram index from the current vocabulary."""
+        self._grams = {}
+        self._stale = set()
+        for token in self._postings:
+            self._add_vocabulary(token)
+
+    def remove(self, task):
+        """Drop a task from the index."""
+        task_id = task.id
+        for token in set(tokenize(task.description)):
+            ids = self._postings.get(token)
+            if ids is not None:
+                ids.discard(task_id)
+                if not ids:
+                    del self._postings[token]
+                    if len(token) >= _GRAM:
+                        self._stale.add(token)
+        if len(self._stale) > len(self._postings):
+            self._rebuild_grams()
+        key = (task.created_at, task_id)
+        i = bisect_left(self._created, key)
+        if i < len(self._created) and self._created[i] == key:
+            del self._created[i]
+
+    def match_text(self, text, whole_words=False):
+        """
+        Return the ids of tasks whose description may contain ``text``.
+
+        Every query token must match an indexed token, either exactly
+        (``whole_words=True``) or as a substring of it. Callers should
+        still check the description when they need an exact phrase match.
+
+        Returns:
+            A set of task ids, or None if ``text`` has no tokens to look up
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+        result = None
+        # Longer tokens tend to be rarer, so starting with them keeps the
+        # intersections small
+        for token in sorted(set(tokens), key=len, reverse=True):
+            if whole_words:
+                ids = self._postings.get(token, set())
+            else:
+                ids = set()
+                for indexed in self._containing(token):
+                    postings = self._postings.get(indexed)
+                    if postings is not None:
+                        ids |= postings
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+        return result
+
+    def _containing(self, token):
+        """
+        Return vocabulary tokens that contain ``token`` as a substring.
+
+        May include tokens that are no longer indexed; callers skip those.
+        """
+        if len(token) < _GRAM:
+            # Too short for a trigram lookup; such tokens match a large part
+            # of the vocabulary anyway
+            return [indexed for indexed in self._postings if token in indexed]
+        # The rarest trigram gives the fewest tokens to check
+        grams = self._grams
+        shortest = min((grams.get(gram, ()) for gram in _grams(token)), key=len)
+        if len(token) == _GRAM:
+            return shortest
+        return [indexed for indexed in shortest if token in indexed]
+
+    def created_between(self, start=None, end=None):
+        """
+        Return the ids of tasks created in ``[start, end]``, oldest first.
+
+        ``start`` and ``end`` are timestamps in the same integer seconds as
+        ``Task.created_at``; either may be None for an open range.
+        """
+        lo = 0 if start is None else bisect_left(self._created, (start,))
+        if end is None:
+            hi = len(self._created)
+        else:
+            # Any id sorts before (end, inf), so ties on end are included
+            hi = bisect_right(self._created, (end, float("inf")))
+        return [task_id for _, task_id in self._created[lo:hi]]
@@ -0,0 +1,399 @@
+"""
+Storage backends for the To-Do List application.
+
+Every backend exposes the same small interface used by ``TodoList``:
+
+- ``load()`` returns the stored tasks as a list of ``Task`` records
+- ``iter_tasks()`` yields the stored tasks one at a time, so callers can
+  build their own structures without an intermediate list
+- ``save_all(tasks)`` replaces the whole store with the iterable ``tasks``
+- ``write(tasks, changed, deleted)`` persists a single change, where
+  ``changed`` holds the added/updated tasks and ``deleted`` the
+  removed task ids
+- ``lock(shared=False)`` is an advisory inter-process lock held around a
+  read-modify-write cycle
+- ``version()`` returns a token that changes whenever the stored data does,
+  so a ``TodoList`` can tell when another process wrote to it
+- ``close()`` releases any open resources
+"""
+
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked access
+    fcntl = None
+
+from task import Task, parse_timestamp
+
+
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+
+
+class JSONStorage:
+    """Keep all tasks in one JSON file (the default backend for small lists)."""
+
+    def __init__(self, filename="tasks.json"):
+        """Initialize the backend with the JSON file to use."""
+        self.filename = filename
+
+    def load(self):
+        """Load tasks from the JSON file."""
+        try:
+            return list(self.iter_tasks())
+        except json.JSONDecodeError:
+            return []
+
+    def iter_tasks(self):
+        """
+        Stream tasks from the JSON file without reading it all at once.
+
+        Raises:
+            json.JSONDecodeError: If the file is not a JSON array
+        """
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, 'r') as f:
+            for data in iter_json_array(f):
+                yield Task.from_dict(data)
+
+    def save_all(self, tasks):
+        """Save all tasks to the JSON file, replacing it atomically."""
+        _atomic_write_json(self.filename, [task.to_dict() for task in tasks], indent=2)
+
+    def write(self, tasks, changed=(), deleted=()):
+        """Persist a change. A JSON file has no rows, so it is rewritten."""
+        self.save_all(tasks)
+
+    def lock(self, shared=False):
+        """Lock ``<filename>.lock`` for the duration of a ``with`` block."""
+        return _file_lock(self.filename + ".lock", shared)
+
+    def version(self):
+        """Return the modification stamp of the JSON file."""
+        return _file_version(self.filename)
+
+    def close(self):
+        """Nothing to release for a plain file."""
+
+
+class JournalStorage:
+    """
+    Append each change to a journal instead of rewriting the task file.
+
+    The task file holds the last snapshot (same format as ``JSONStorage``)
+    and ``<filename>.journal`` holds one JSON line per change since then.
+    Loading replays the journal over the snapshot; once the journal grows
+    past ``max_ops`` lines or ``max_bytes`` it is folded into a new snapshot.
+    """
+
+    def __init__(self, filename="tasks.json", max_ops=1000, max_bytes=1024 * 1024):
+        """
+        Initialize the backend.
+
+        Args:
+            filename: Snapshot file; the journal lives next to it
+            max_ops: Compact once the journal holds this many entries
+            max_bytes: Compact once the journal grows past this size
+        """
+        self.filename = filename
+        self.journal_filename = filename + ".journal"
+        self.max_ops = max_ops
+        self.max_bytes = max_bytes
+        self._ops = 0
+
+    def load(self):
+        """Load the snapshot and replay the journal over it."""
+        return list(self._replay().values())
+
+    def iter_tasks(self):
+        """Yield the tasks of the snapshot with the journal replayed over it."""
+        yield from self._replay().values()
+
+    def _replay(self):
+        """Return the replayed tasks as an id -> task dict."""
+        tasks = {}
+        try:
+            for task in JSONStorage(self.filename).iter_tasks():
+                tasks[task.id] = task
+        except json.JSONDecodeError:
+            tasks = {}
+        self._ops = 0
+        if not os.path.exists(self.journal_filename):
+            return tasks
+
+        good_end = 0
+        with open(self.journal_filename, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete line")
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from an interrupted append
+                    break
+                if entry["op"] == "put":
+                    task = Task.from_dict(entry["task"])
+                    tasks[task.id] = task
+                elif entry["op"] == "delete":
+                    for task_id in entry["ids"]:
+                        tasks.pop(task_id, None)
+                good_end += len(line)
+                self._ops += 1
+        if good_end < os.path.getsize(self.journal_filename):
+            # Drop the torn tail so later appends start on a fresh line
+            os.truncate(self.journal_filename, good_end)
+        return tasks
+
+    def save_all(self, tasks):
+        """Write a fresh snapshot and empty the journal."""
+        self.compact(tasks)
+
+    def write(self, tasks, changed=(), deleted=()):
+        """Append the change to the journal, compacting when it gets large."""
+        lines = [json.dumps({"op": "put", "task": task.to_dict()}) + "\n"
+                 for task in changed]
+        if deleted:
+            lines.append(json.dumps({"op": "delete", "ids": list(deleted)}) + "\n")
+        if not lines:
+            return
+        with open(self.journal_filename, 'a') as f:
+            f.writelines(lines)
+            size = f.tell()
+        self._ops += len(lines)
+        if self._ops >= self.max_ops or size >= self.max_bytes:
+            self.compact(tasks)
+
+    def compact(self, tasks):
+        """Fold the journal into a new snapshot."""
+        _atomic_write_json(self.filename, [task.to_dict() for task in tasks])
+        # Replaying an old journal over the new snapshot is harmless, so a
+        # crash between these two steps loses nothing.
+        open(self.journal_filename, 'w').close()
+        self._ops = 0
+
+    def lock(self, shared=False):
+        """Lock ``<filename>.lock`` for the duration of a ``with`` block."""
+        return _file_lock(self.filename + ".lock", shared)
+
+    def version(self):
+        """Return the modification stamps of the snapshot and the journal."""
+        return _file_version(self.filename), _file_version(self.journal_filename)
+
+    def close(self):
+        """Nothing to release; every append is closed right away."""
+
+
+class SQLiteStorage:
+    """Keep tasks in an SQLite database and only write the rows that change."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            priority TEXT NOT NULL DEFAULT 'medium',
+            completed INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority);
+        CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed);
+        CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at);
+    """
+
+    def __init__(self, filename="tasks.db", migrate_from=None):
+        """
+        Open (or create) the database.
+
+        Args:
+            filename: Path of the SQLite database file
+            migrate_from: Optional JSON task file imported once when the
+                database is still empty
+        """
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        self.conn.executescript(self.SCHEMA)
+        if migrate_from and self.is_empty() and os.path.exists(migrate_from):
+            self.import_json(migrate_from)
+
+    def is_empty(self):
+        """Return True if the database holds no tasks."""
+        return self.conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone() is None
+
+    def load(self):
+        """Load all tasks ordered by id."""
+        return list(self.iter_tasks())
+
+    def iter_tasks(self):
+        """Yield tasks ordered by id straight from the database cursor."""
+        rows = self.conn.execute(
+            "SELECT id, description, priority, completed, created_at "
+            "FROM tasks ORDER BY id"
+        )
+        for row in rows:
+            yield self._row_to_task(row)
+
+    def save_all(self, tasks):
+        """Replace the contents of the database with ``tasks``."""
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks")
+            self._upsert(tasks)
+
+    def write(self, tasks, changed=(), deleted=()):
+        """Write only the changed and deleted rows in one transaction."""
+        with self.conn:
+            if changed:
+                self._upsert(changed)
+            if deleted:
+                self.conn.executemany(
+                    "DELETE FROM tasks WHERE id = ?",
+                    ((task_id,) for task_id in deleted)
+                )
+
+    def import_json(self, json_filename):
+        """
+        One-shot migration of an existing JSON task file.
+
+        Returns:
+            The number of imported tasks
+        """
+        tasks = JSONStorage(json_filename).load()
+        with self.conn:
+            self._upsert(tasks)
+        return len(tasks)
+
+    def lock(self, shared=False):
+        """Lock ``<filename>.lock`` for the duration of a ``with`` block."""
+        return _file_lock(self.filename + ".lock", shared)
+
+    def version(self):
+        """Return SQLite's counter of commits made by other connections."""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+    def _upsert(self, tasks):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO tasks "
+            "(id, description, priority, completed, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                (task.id, task.description, task.priority,
+                 int(task.completed), task.created_text)
+                for task in tasks
+            )
+        )
+
+    @staticmethod
+    def _row_to_task(row):
+        task_id, description, priority, completed, created_at = row
+        return Task(task_id, description, priority, completed,
+                    parse_timestamp(created_at))
+
+
+def iter_json_array(f, chunk_size=64 * 1024):
+    """
+    Yield the items of a top-level JSON array read incrementally from ``f``.
+
+    Only about ``chunk_size`` characters plus the current item are held in
+    memory, so huge files can be consumed item by item.
+
+    Raises:
+        json.JSONDecodeError: If the stream is not a well-formed JSON array
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    expect = "["
+
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos == len(buf):
+            if eof:
+                raise json.JSONDecodeError("Unexpected end of JSON array", buf, pos)
+            buf = f.read(chunk_size)
+            pos = 0
+            eof = not buf
+            continue
+
+        char = buf[pos]
+        if expect == "[":
+            if char != "[":
+                raise json.JSONDecodeError("Expecting '['", buf, pos)
+            expect = "first"
+            pos += 1
+            continue
+        if expect == "delimiter":
+            if char == "]":
+                return
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+            expect = "item"
+            pos += 1
+            continue
+        if char == "]" and expect == "first":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+            # A number cut off by the end of the buffer may continue in the
+            # next chunk, so only trust it once a delimiter has been seen
+            complete = (eof or isinstance(item, bool)
+                        or not isinstance(item, (int, float))
+                        or buf[end:].strip("0123456789+-.eE") != "")
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            more = f.read(chunk_size)
+            eof = not more
+            buf = buf[pos:] + more
+            pos = 0
+            continue
+
+        yield item
+        expect = "delimiter"
+        pos = end
+        if pos >= chunk_size:
+            buf = buf[pos:]
+            pos = 0
+
+
+def _atomic_write_json(filename, data, indent=None):
+    """Write JSON to a temporary file and move it over ``filename``."""
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp_filename, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_filename, filename)
+
+
+@contextmanager
+def _file_lock(lock_filename, shared=False):
+    """Hold an advisory ``flock`` on ``lock_filename``."""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_filename, 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _file_version(filename):
+    """Return (mtime_ns, size, inode) of a file, or None if it is missing."""
+    try:
+        st = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
@@ -0,0 +1,105 @@
+"""
+Task record for the To-Do List application.
+
+A ``Task`` uses ``__slots__`` instead of a per-task dict, keeps its
+creation time as an integer and shares one string object per priority,
+which roughly halves the memory of large lists.
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+
+
+def parse_timestamp(text):
+    """
+    Convert a "YYYY-MM-DD HH:MM:SS" string to integer seconds.
+
+    The string is a local wall-clock time, so it is counted from
+    1970-01-01 00:00:00 on the same clock without any timezone shift.
+    That keeps the conversion exact in both directions. A bare
+    "YYYY-MM-DD" means midnight.
+    """
+    moment = datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]))
+    seconds = (moment.toordinal() - _EPOCH_ORDINAL) * 86400
+    if len(text) > 10:
+        seconds += int(text[11:13]) * 3600 + int(text[14:16]) * 60 + int(text[17:19])
+    return seconds
+
+
+def format_timestamp(seconds):
+    """Convert integer seconds back to a "YYYY-MM-DD HH:MM:SS" string."""
+    return (_EPOCH + timedelta(seconds=seconds)).strftime(TIME_FORMAT)
+
+
+def now_timestamp():
+    """Return the current local time as integer seconds."""
+    return parse_timestamp(datetime.now().strftime(TIME_FORMAT))
+
+
+class Task:
+    """A single to-do item."""
+
+    __slots__ = ("id", "description", "priority", "completed", "created_at")
+
+    def __init__(self, task_id, description, priority="medium", completed=False,
+                 created_at=None):
+        """
+        Create a task.
+
+        Args:
+            task_id: Unique task ID
+            description: What needs to be done
+            priority: "high", "medium" or "low" (default: "medium")
+            completed: Whether the task is done (default: False)
+            created_at: Creation time in seconds (see parse_timestamp),
+                defaults to now
+        """
+        self.id = task_id
+        self.description = description
+        self.priority = sys.intern(priority)
+        self.completed = bool(completed)
+        self.created_at = now_timestamp() if created_at is None else created_at
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a task from the JSON task format."""
+        return cls(data["id"], data["description"], data["priority"],
+                   data["completed"], parse_timestamp(data["created_at"]))
+
+    def to_dict(self):
+        """Return the task in the JSON task format."""
+        return {
+            "id": self.id,
+            "description": self.description,
+            "priority": self.priority,
+            "completed": self.completed,
+            "created_at": self.created_text
+        }
+
+    @property
+    def created_text(self):
+        """The creation time as a "YYYY-MM-DD HH:MM:SS" string."""
+        return format_timestamp(self.created_at)
+
+    def copy(self):
+        """Return a copy of the task."""
+        return Task(self.id, self.description, self.priority, self.completed,
+                    self.created_at)
+
+    def __eq__(self, other):
+        if not isinstance(other, Task):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name)
+                   for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"Task(id={self.id!r}, description={self.description!r}, "
+                f"priority={self.priority!r}, completed={self.completed!r}, "
+                f"created_at={self.created_text!r})")
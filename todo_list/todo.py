@@ -3,107 +3,505 @@ To-Do List Application
 A command-line application to manage your daily tasks with persistent storage.
 """
 
+import argparse
+import heapq
 import json
-import os
-from datetime import datetime
+import sys
+from contextlib import contextmanager
+from itertools import islice
+
+from search import SearchIndex
+from storage import JournalStorage, JSONStorage, SQLiteStorage
+from task import Task, parse_timestamp
+
+
+PAGE_SIZE = 20
+PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+SORT_KEYS = {
+    "id": lambda task: task.id,
+    "priority": lambda task: (PRIORITY_ORDER.get(task.priority, 1), task.id),
+    "created_at": lambda task: (task.created_at, task.id)
+}
 
 
 class TodoList:
     """A simple to-do list manager with file persistence."""
     
-    def __init__(self, filename="tasks.json"):
-        """Initialize the to-do list with a file for persistence."""
-        self.filename = filename
-        self.tasks = self.load_tasks()
+    def __init__(self, filename="tasks.json", storage=None):
+        """
+        Initialize the to-do list with a storage backend for persistence.
+        
+        Args:
+            filename: JSON file used when no storage backend is given
+            storage: Optional storage backend (see storage.py)
+        """
+        self.storage = storage or JSONStorage(filename)
+        self.filename = self.storage.filename
+        self._batch = None
+        self._lock_depth = 0
+        # Tasks are loaded on first use so opening a huge list is instant
+        self._loaded = False
+        self._version = None
+    
+    @property
+    def tasks(self):
+        """All tasks in insertion order."""
+        self._ensure_loaded()
+        return list(self._tasks_by_id.values())
     
-    def load_tasks(self):
-        """Load tasks from the JSON file."""
-        if os.path.exists(self.filename):
+    @tasks.setter
+    def tasks(self, tasks):
+        """Replace all tasks (any iterable) and rebuild the indexes."""
+        self._loaded = True
+        self._tasks_by_id = {}
+        self._by_priority = {}
+        self._by_status = {False: {}, True: {}}
+        self._max_id = 0
+        # The search index is built in one pass once all tasks are in, then
+        # kept up to date as tasks change
+        self._search = None
+        for task in tasks:
+            self._index_task(task)
+        self._search = SearchIndex(self._tasks_by_id.values())
+    
+    def _index_task(self, task):
+        """Add a task to the id map and the secondary indexes."""
+        task_id = task.id
+        self._tasks_by_id[task_id] = task
+        self._by_priority.setdefault(task.priority, {})[task_id] = task
+        self._by_status[task.completed][task_id] = task
+        if task_id > self._max_id:
+            self._max_id = task_id
+        if self._search is not None:
+            self._search.add(task)
+    
+    def _unindex_task(self, task):
+        """Remove a task from the id map and the secondary indexes."""
+        task_id = task.id
+        del self._tasks_by_id[task_id]
+        del self._by_priority[task.priority][task_id]
+        del self._by_status[task.completed][task_id]
+        if task_id == self._max_id:
+            # Recomputed on the next add, so new ids match a fresh load
+            self._max_id = None
+        if self._search is not None:
+            self._search.remove(task)
+    
+    def _ensure_loaded(self):
+        """Build the indexes from storage the first time they are needed."""
+        if not self._loaded:
+            self._reload()
+    
+    def _reload(self):
+        """Rebuild the indexes from storage and remember its version."""
+        if self._lock_depth:
+            self._read_storage()
+        else:
+            with self.storage.lock(shared=True):
+                self._read_storage()
+    
+    def _read_storage(self):
+        """Stream all tasks from storage into the indexes."""
+        self._version = self.storage.version()
+        try:
+            # Index tasks as they are streamed in, without a full list first
+            self.tasks = self.storage.iter_tasks()
+        except json.JSONDecodeError:
+            self.tasks = []
+    
+    def refresh(self):
+        """Reload the tasks if another process changed the storage."""
+        if not self._loaded or self.storage.version() != self._version:
+            self._reload()
+    
+    @contextmanager
+    def _locked(self):
+        """
+        Hold the storage lock around a read-modify-write cycle.
+        
+        Tasks changed by other processes are reloaded first, so their
+        updates are not overwritten. The lock is only held for the single
+        change (or batch), never for the whole session.
+        """
+        if self._lock_depth:
+            yield
+            return
+        with self.storage.lock():
+            self._lock_depth += 1
             try:
-                with open(self.filename, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return []
-        return []
+                self.refresh()
+                yield
+                self._version = self.storage.version()
+            finally:
+                self._lock_depth -= 1
+    
+    def load_tasks(self):
+        """Load tasks from the storage backend."""
+        return self.storage.load()
     
     def save_tasks(self):
-        """Save tasks to the JSON file."""
-        with open(self.filename, 'w') as f:
-            json.dump(self.tasks, f, indent=2)
+        """Save all tasks to the storage backend."""
+        self._ensure_loaded()
+        with self._locked():
+            self.storage.save_all(self._tasks_by_id.values())
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group several changes into a single write.
+        
+        Changes made inside the block are kept in memory and written once
+        when it exits. If the block raises, every change is rolled back.
+        Nested batches join the outermost one.
+        
+        Example:
+            with todo.batch():
+                todo.add_task("Buy milk")
+                todo.complete_task(3)
+        """
+        if self._batch is not None:
+            yield self
+            return
+        
+        with self._locked():
+            self._batch = {
+                "changed": {},
+                "deleted": set(),
+                "originals": {},
+                "order": None,
+                "max_id": self._max_id
+            }
+            try:
+                yield self
+            except BaseException:
+                batch, self._batch = self._batch, None
+                self._rollback(batch)
+                raise
+            batch, self._batch = self._batch, None
+            if batch["changed"] or batch["deleted"]:
+                self.storage.write(self._tasks_by_id.values(),
+                                   changed=list(batch["changed"].values()),
+                                   deleted=list(batch["deleted"]))
+    
+    def _remember(self, task_id, deleting=False):
+        """Record the state of a task before the current batch changes it."""
+        batch = self._batch
+        if batch is None:
+            return
+        if deleting and batch["order"] is None:
+            batch["order"] = list(self._tasks_by_id)
+        if task_id not in batch["originals"]:
+            task = self._tasks_by_id.get(task_id)
+            batch["originals"][task_id] = task.copy() if task else None
+    
+    def _rollback(self, batch):
+        """Restore the tasks as they were before the batch started."""
+        originals = batch["originals"]
+        order = batch["order"] or list(self._tasks_by_id)
+        tasks = []
+        for task_id in order:
+            if task_id not in originals:
+                tasks.append(self._tasks_by_id[task_id])
+            elif originals[task_id] is not None:
+                tasks.append(originals[task_id])
+        self.tasks = tasks
+        self._max_id = batch["max_id"]
+    
+    def _persist(self, changed=(), deleted=()):
+        """Write a change now, or buffer it while a batch is open."""
+        batch = self._batch
+        if batch is None:
+            self.storage.write(self._tasks_by_id.values(),
+                               changed=changed, deleted=deleted)
+            return
+        for task in changed:
+            batch["changed"][task.id] = task
+            batch["deleted"].discard(task.id)
+        for task_id in deleted:
+            batch["changed"].pop(task_id, None)
+            batch["deleted"].add(task_id)
+    
+    def get_task(self, task_id):
+        """Return the task with the given ID, or None."""
+        self._ensure_loaded()
+        return self._tasks_by_id.get(task_id)
+    
+    def pending_tasks(self):
+        """Return the tasks that are not completed yet."""
+        self._ensure_loaded()
+        return list(self._by_status[False].values())
+    
+    def completed_tasks(self):
+        """Return the completed tasks."""
+        self._ensure_loaded()
+        return list(self._by_status[True].values())
+    
+    def tasks_by_priority(self, priority):
+        """Return the tasks with the given priority."""
+        self._ensure_loaded()
+        return list(self._by_priority.get(priority, {}).values())
+    
+    def search(self, text=None, priority=None, completed=None,
+               created_after=None, created_before=None, sort="id",
+               descending=False, limit=None, whole_words=False):
+        """
+        Find tasks matching all of the given filters.
+        
+        Args:
+            text: Text that must appear in the description (case-insensitive)
+            priority: Only tasks with this priority
+            completed: True/False to only return completed/pending tasks
+            created_after: Earliest creation time, as seconds or a
+                "YYYY-MM-DD[ HH:MM:SS]" string
+            created_before: Latest creation time, as seconds or a
+                "YYYY-MM-DD[ HH:MM:SS]" string
+            sort: "id", "priority" or "created_at"
+            descending: Reverse the sort order
+            limit: Maximum number of tasks to return
+            whole_words: Match query words against whole words only
+        
+        Returns:
+            A list of matching tasks
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        self.refresh()
+        
+        # Start from the most selective index, then filter the rest per task
+        candidates = None
+        if text:
+            candidates = self._search.match_text(text, whole_words)
+        if created_after is not None or created_before is not None:
+            if isinstance(created_after, str):
+                created_after = parse_timestamp(created_after)
+            if isinstance(created_before, str):
+                if len(created_before) == 10:
+                    created_before += " 23:59:59"
+                created_before = parse_timestamp(created_before)
+            in_range = self._search.created_between(created_after, created_before)
+            candidates = (set(in_range) if candidates is None
+                          else candidates.intersection(in_range))
+        if candidates is None:
+            if priority is not None:
+                candidates = self._by_priority.get(priority, {})
+            elif completed is not None:
+                candidates = self._by_status[bool(completed)]
+            else:
+                candidates = self._tasks_by_id
+        
+        needle = text.lower() if text else None
+        results = []
+        for task_id in candidates:
+            task = self._tasks_by_id[task_id]
+            if priority is not None and task.priority != priority:
+                continue
+            if completed is not None and task.completed != bool(completed):
+                continue
+            if needle and needle not in task.description.lower():
+                continue
+            results.append(task)
+        
+        key = SORT_KEYS[sort]
+        if limit is not None:
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            return pick(limit, results, key=key)
+        results.sort(key=key, reverse=descending)
+        return results
+    
+    def _new_task(self, description, priority):
+        """Create and index a new task."""
+        self._ensure_loaded()
+        if self._max_id is None:
+            self._max_id = max(self._tasks_by_id, default=0)
+        task = Task(self._max_id + 1, description, priority)
+        self._remember(task.id)
+        self._index_task(task)
+        return task
+    
+    def _mark_completed(self, task_id):
+        """Mark a task as completed and return it, or None if it is missing."""
+        self._ensure_loaded()
+        task = self._tasks_by_id.get(task_id)
+        if task is not None and not task.completed:
+            self._remember(task_id)
+            del self._by_status[False][task_id]
+            task.completed = True
+            self._by_status[True][task_id] = task
+        return task
+    
+    def _remove(self, task_id):
+        """Remove a task and return it, or None if it is missing."""
+        self._ensure_loaded()
+        task = self._tasks_by_id.get(task_id)
+        if task is not None:
+            self._remember(task_id, deleting=True)
+            self._unindex_task(task)
+        return task
     
     def add_task(self, description, priority="medium"):
         """Add a new task to the list."""
-        # Generate unique ID by finding max ID and adding 1
-        max_id = max([task["id"] for task in self.tasks], default=0)
-        task = {
-            "id": max_id + 1,
-            "description": description,
-            "priority": priority,
-            "completed": False,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        self.tasks.append(task)
-        self.save_tasks()
+        with self._locked():
+            task = self._new_task(description, priority)
+            self._persist(changed=[task])
         print(f"Task added: {description}")
     
-    def view_tasks(self, show_completed=True):
-        """Display all tasks."""
-        if not self.tasks:
-            print("No tasks found!")
-            return
+    def add_tasks(self, tasks):
+        """
+        Add many tasks with a single write.
+        
+        Args:
+            tasks: Iterable of descriptions or (description, priority) pairs
+        """
+        added = []
+        with self.batch():
+            for item in tasks:
+                if isinstance(item, str):
+                    added.append(self._new_task(item, "medium"))
+                else:
+                    added.append(self._new_task(*item))
+            self._persist(changed=added)
+        print(f"Added {len(added)} task(s)!")
+    
+    def view_tasks(self, show_completed=True, page_size=None, offset=0):
+        """
+        Display tasks, optionally one page at a time.
         
-        print("\n" + "=" * 80)
-        print("YOUR TASKS".center(80))
-        print("=" * 80)
+        Each page is rendered into a single buffered write. Before the
+        tasks have been loaded, a page is read straight from storage, so
+        the first page of a huge list shows up without indexing it all.
         
-        for task in self.tasks:
-            if not show_completed and task["completed"]:
-                continue
-            
-            status = "✓" if task["completed"] else "○"
-            priority_symbols = {"high": "!!!", "medium": "!!", "low": "!"}
-            priority = priority_symbols.get(task["priority"], "!!")
+        Args:
+            show_completed: Include completed tasks (default: True)
+            page_size: Number of tasks per page, or None for all tasks
+            offset: Number of matching tasks to skip
+        
+        Returns:
+            The number of tasks displayed
+        """
+        stop = None if page_size is None else offset + page_size
+        if self._loaded:
+            self.refresh()
+            source = self._tasks_by_id if show_completed else self._by_status[False]
+            page = list(islice(source.values(), offset, stop))
+        else:
+            with self.storage.lock(shared=True):
+                tasks = self.storage.iter_tasks()
+                if not show_completed:
+                    tasks = (task for task in tasks if not task.completed)
+                try:
+                    page = list(islice(tasks, offset, stop))
+                except json.JSONDecodeError:
+                    page = []
+        
+        if not page:
+            print("No tasks found!" if offset == 0 else "No more tasks.")
+            return 0
+        
+        footer = None
+        if page_size is not None:
+            footer = f"Showing {offset + 1}-{offset + len(page)}"
+        self.print_tasks(page, "YOUR TASKS", footer)
+        return len(page)
+    
+    @staticmethod
+    def print_tasks(tasks, title, footer=None):
+        """Render tasks into a single buffered write."""
+        priority_symbols = {"high": "!!!", "medium": "!!", "low": "!"}
+        lines = ["\n" + "=" * 80, title.center(80), "=" * 80]
+        for task in tasks:
+            status = "✓" if task.completed else "○"
+            priority = priority_symbols.get(task.priority, "!!")
             
-            print(f"\n[{status}] Task #{task['id']} {priority}")
-            print(f"    {task['description']}")
-            print(f"    Created: {task['created_at']}")
-            if task["completed"]:
-                print(f"    Status: Completed")
+            lines.append(f"\n[{status}] Task #{task.id} {priority}")
+            lines.append(f"    {task.description}")
+            lines.append(f"    Created: {task.created_text}")
+            if task.completed:
+                lines.append("    Status: Completed")
         
-        print("\n" + "=" * 80)
+        if footer:
+            lines.append("\n" + footer)
+        lines.append("\n" + "=" * 80 + "\n")
+        sys.stdout.write("\n".join(lines))
     
     def complete_task(self, task_id):
         """Mark a task as completed."""
-        for task in self.tasks:
-            if task["id"] == task_id:
-                task["completed"] = True
-                self.save_tasks()
-                print(f"Task #{task_id} marked as completed!")
-                return
-        print(f"Task #{task_id} not found!")
+        with self._locked():
+            task = self._mark_completed(task_id)
+            if task is not None:
+                self._persist(changed=[task])
+        if task is None:
+            print(f"Task #{task_id} not found!")
+            return
+        print(f"Task #{task_id} marked as completed!")
+    
+    def complete_tasks(self, task_ids):
+        """Mark many tasks as completed with a single write."""
+        completed = []
+        missing = []
+        with self.batch():
+            for task_id in task_ids:
+                task = self._mark_completed(task_id)
+                if task is None:
+                    missing.append(task_id)
+                else:
+                    completed.append(task)
+            self._persist(changed=completed)
+        print(f"Marked {len(completed)} task(s) as completed!")
+        if missing:
+            print(f"Not found: {', '.join(f'#{task_id}' for task_id in missing)}")
     
     def delete_task(self, task_id):
         """Delete a task from the list."""
-        for i, task in enumerate(self.tasks):
-            if task["id"] == task_id:
-                deleted_task = self.tasks.pop(i)
-                self.save_tasks()
-                print(f"Task deleted: {deleted_task['description']}")
-                return
-        print(f"Task #{task_id} not found!")
+        with self._locked():
+            task = self._remove(task_id)
+            if task is not None:
+                self._persist(deleted=[task_id])
+        if task is None:
+            print(f"Task #{task_id} not found!")
+            return
+        print(f"Task deleted: {task.description}")
+    
+    def delete_tasks(self, task_ids):
+        """Delete many tasks with a single write."""
+        deleted = []
+        missing = []
+        with self.batch():
+            for task_id in task_ids:
+                if self._remove(task_id) is None:
+                    missing.append(task_id)
+                else:
+                    deleted.append(task_id)
+            self._persist(deleted=deleted)
+        print(f"Deleted {len(deleted)} task(s)!")
+        if missing:
+            print(f"Not found: {', '.join(f'#{task_id}' for task_id in missing)}")
     
     def clear_completed(self):
         """Remove all completed tasks."""
-        initial_count = len(self.tasks)
-        self.tasks = [task for task in self.tasks if not task["completed"]]
-        removed = initial_count - len(self.tasks)
-        self.save_tasks()
-        print(f"Removed {removed} completed task(s)!")
+        with self.batch():
+            removed_ids = list(self._by_status[True])
+            for task_id in removed_ids:
+                self._remove(task_id)
+            self._persist(deleted=removed_ids)
+        print(f"Removed {len(removed_ids)} completed task(s)!")
 
 
 def main():
     """Main function to run the to-do list application."""
-    todo = TodoList()
+    parser = argparse.ArgumentParser(description="To-Do List Manager")
+    parser.add_argument("--backend", choices=["json", "journal", "sqlite"], default="json",
+                        help="storage backend (default: json)")
+    parser.add_argument("--file", help="task file (default: tasks.json or tasks.db)")
+    args = parser.parse_args()
+    
+    if args.backend == "sqlite":
+        # Existing tasks.json contents are imported the first time
+        storage = SQLiteStorage(args.file or "tasks.db", migrate_from="tasks.json")
+        todo = TodoList(storage=storage)
+    elif args.backend == "journal":
+        todo = TodoList(storage=JournalStorage(args.file or "tasks.json"))
+    else:
+        todo = TodoList(args.file or "tasks.json")
     
     print("=" * 50)
     print("To-Do List Manager".center(50))
@@ -117,11 +515,13 @@ def main():
         print("4. Complete Task")
         print("5. Delete Task")
         print("6. Clear Completed Tasks")
-        print("7. Exit")
+        print("7. Search Tasks")
+        print("8. Exit")
         
-        choice = input("\nSelect option (1-7): ").strip()
+        choice = input("\nSelect option (1-8): ").strip()
         
-        if choice == '7':
+        if choice == '8':
+            todo.storage.close()
             print("Goodbye!")
             break
         
@@ -135,11 +535,16 @@ def main():
             else:
                 print("Task description cannot be empty!")
         
-        elif choice == '2':
-            todo.view_tasks(show_completed=True)
-        
-        elif choice == '3':
-            todo.view_tasks(show_completed=False)
+        elif choice in ('2', '3'):
+            offset = 0
+            while True:
+                shown = todo.view_tasks(show_completed=(choice == '2'),
+                                        page_size=PAGE_SIZE, offset=offset)
+                if shown < PAGE_SIZE:
+                    break
+                offset += shown
+                if input("Press Enter for more, or 'q' to stop: ").strip().lower() == 'q':
+                    break
         
         elif choice == '4':
             try:
@@ -160,6 +565,19 @@ def main():
             if confirm == 'yes':
                 todo.clear_completed()
         
+        elif choice == '7':
+            text = input("Search text: ").strip()
+            priority = input("Priority (high/medium/low) [any]: ").strip().lower() or None
+            sort = input("Sort by (id/priority/created_at) [id]: ").strip().lower() or "id"
+            if sort not in SORT_KEYS:
+                sort = "id"
+            results = todo.search(text=text or None, priority=priority, sort=sort)
+            if results:
+                todo.print_tasks(results[:PAGE_SIZE], "SEARCH RESULTS",
+                                  f"{len(results)} match(es)")
+            else:
+                print("No matching tasks found!")
+        
         else:
             print("Invalid choice! Please try again.")
 
@@ -0,0 +1,91 @@
+"""
+Batch Weather Lookup
+Look up the weather for a list of cities concurrently and write one JSON
+object per line.
+
+Usage:
+    python batch.py cities.txt --concurrency 16 > weather.jsonl
+    cat cities.txt | python batch.py --units imperial --output weather.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from cache import WeatherCache
+from resilience import RetryPolicy, TokenBucket
+from transport import PooledTransport
+from weather import WeatherApp
+
+
+def read_cities(lines):
+    """Yield city names from lines, skipping blank lines and # comments."""
+    for line in lines:
+        city = line.strip()
+        if city and not city.startswith('#'):
+            yield city
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Look up weather for many cities.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="file with one city per line (default: stdin)")
+    parser.add_argument("-u", "--units", default="metric",
+                        choices=["metric", "imperial", "standard"],
+                        help="temperature units (default: metric)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8,
+                        help="lookups running at once (default: 8)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="JSON lines output file (default: stdout)")
+    parser.add_argument("--cache",
+                        help="cache file (.db/.sqlite for SQLite, otherwise JSON)")
+    parser.add_argument("--rate", type=float,
+                        help="maximum requests per minute (default: unlimited)")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="retries for rate-limited, 5xx and network failures (default: 2)")
+    parser.add_argument("--base-url",
+                        help="current-weather endpoint (default: OpenWeatherMap)")
+    args = parser.parse_args(argv)
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.retries < 0:
+        parser.error("--retries cannot be negative")
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be positive")
+    if not os.getenv('OPENWEATHER_API_KEY'):
+        parser.error("set the OPENWEATHER_API_KEY environment variable")
+
+    cache = WeatherCache(path=args.cache) if args.cache else None
+    transport = PooledTransport(pool_size=args.concurrency)
+    rate_limiter = TokenBucket.per_minute(args.rate) if args.rate else None
+    app = WeatherApp(cache=cache, transport=transport, base_url=args.base_url,
+                     rate_limiter=rate_limiter, retry=RetryPolicy(args.retries + 1))
+
+    source = sys.stdin if args.input == "-" else open(args.input, 'r', encoding='utf-8')
+    out = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8')
+    found = failed = 0
+    try:
+        for city, result in app.get_weather_many(read_cities(source), args.units,
+                                                 args.concurrency):
+            if 'error' in result:
+                failed += 1
+            else:
+                found += 1
+            out.write(json.dumps({'query': city, **result}, ensure_ascii=False) + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+        transport.close()
+        if cache is not None:
+            cache.close()
+
+    sys.stderr.write(f"Found: {found}\nFailed: {failed}\n")
+
+
+if __name__ == "__main__":
+    main()
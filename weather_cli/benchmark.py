@@ -0,0 +1,170 @@
+"""
+Weather Lookup Benchmark
+Measure requests per second and p50/p95/p99 latency of WeatherApp's fetch
+paths against the local stub server (or any compatible endpoint).
+
+Paths:
+    sequential  one new connection per request (urllib.request.urlopen)
+    pooled      keep-alive connections (PooledTransport)
+    cached      pooled, with a warm WeatherCache
+    concurrent  pooled, through get_weather_many
+
+Usage:
+    python benchmark.py --requests 1000 --latency 0.01 --jitter 0.005
+    python benchmark.py --paths pooled concurrent --concurrency 32 --json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from urllib import error, request
+
+from cache import WeatherCache
+from resilience import RetryPolicy
+from stub_server import StubWeatherServer
+from transport import PooledTransport
+from weather import WeatherApp
+
+
+PATHS = ("sequential", "pooled", "cached", "concurrent")
+
+
+class UrlopenTransport:
+    """The pre-pooling transport: a new connection for every request."""
+
+    def get(self, url, headers=None):
+        try:
+            with request.urlopen(request.Request(url, headers=headers or {})) as response:
+                return response.status, response.read()
+        except error.HTTPError as e:
+            return e.code, e.read()
+
+    def close(self):
+        pass
+
+
+def _timed(function, latencies):
+    """Wrap a function so every call's duration is appended to ``latencies``."""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    return wrapper
+
+
+def summarize(name, latencies, elapsed, errors):
+    """Return the benchmark figures for one path as a dictionary."""
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        'path': name,
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(elapsed, 4),
+        'requests_per_sec': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(p50 * 1000, 3),
+        'p95_ms': round(p95 * 1000, 3),
+        'p99_ms': round(p99 * 1000, 3)
+    }
+
+
+def run_path(name, base_url, api_key, requests, cities, concurrency):
+    """Run one fetch path and return its summary."""
+    queries = [cities[i % len(cities)] for i in range(requests)]
+    transport = UrlopenTransport() if name == "sequential" else PooledTransport(
+        pool_size=concurrency if name == "concurrent" else 1)
+    cache = WeatherCache(max_entries=len(cities)) if name == "cached" else None
+    # Retries would hide failures and distort latency; count errors instead
+    app = WeatherApp(api_key, cache, transport, base_url, retry=RetryPolicy(1))
+
+    if cache is not None:
+        for city in cities:
+            app.get_weather(city)
+        cache.hits = cache.misses = 0
+
+    latencies = []
+    lock = threading.Lock()
+    errors = 0
+
+    def record(result):
+        nonlocal errors
+        if 'error' in result:
+            with lock:
+                errors += 1
+
+    app.get_weather = _timed(app.get_weather, latencies)
+    start = time.perf_counter()
+    if name == "concurrent":
+        for _, result in app.get_weather_many(queries, concurrency=concurrency):
+            record(result)
+    else:
+        for city in queries:
+            record(app.get_weather(city))
+    elapsed = time.perf_counter() - start
+    transport.close()
+    return summarize(name, latencies, elapsed, errors)
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark WeatherApp fetch paths.")
+    parser.add_argument("-n", "--requests", type=int, default=500,
+                        help="requests per path (default: 500)")
+    parser.add_argument("--cities", type=int, default=50,
+                        help="distinct cities queried (default: 50)")
+    parser.add_argument("-c", "--concurrency", type=int, default=16,
+                        help="threads for the concurrent path (default: 16)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="stub server latency in seconds (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="stub server latency jitter in seconds (default: 0)")
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=list(PATHS),
+                        help="paths to run (default: all)")
+    parser.add_argument("--base-url",
+                        help="benchmark this endpoint instead of a local stub server")
+    parser.add_argument("--api-key", default="benchmark",
+                        help="API key sent with every request (default: benchmark)")
+    parser.add_argument("--json", action="store_true",
+                        help="print one JSON object per path")
+    args = parser.parse_args(argv)
+
+    if args.requests < 1 or args.cities < 1 or args.concurrency < 1:
+        parser.error("--requests, --cities and --concurrency must be at least 1")
+    cities = [f"City {i}" for i in range(args.cities)]
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = StubWeatherServer(latency=args.latency, jitter=args.jitter,
+                                   api_key=args.api_key).start()
+        base_url = server.base_url
+
+    try:
+        if not args.json:
+            print(f"{'path':<12}{'requests':>10}{'errors':>8}{'req/s':>10}"
+                  f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name in args.paths:
+            summary = run_path(name, base_url, args.api_key, args.requests,
+                               cities, args.concurrency)
+            if args.json:
+                print(json.dumps(summary))
+            else:
+                print(f"{name:<12}{summary['requests']:>10}{summary['errors']:>8}"
+                      f"{summary['requests_per_sec']:>10}{summary['p50_ms']:>10}"
+                      f"{summary['p95_ms']:>10}{summary['p99_ms']:>10}")
+            sys.stdout.flush()
+    finally:
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
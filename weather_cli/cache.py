@@ -0,0 +1,217 @@
+"""
+Weather Response Cache
+An in-memory TTL cache with LRU eviction for WeatherApp responses,
+optionally persisted to a JSON file or an SQLite database so warm starts
+skip the network.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+
+def cache_key(city, units):
+    """Return the cache key for a query: normalized city name and units."""
+    return (' '.join(city.split()).casefold(), units.lower())
+
+
+class WeatherCache:
+    """
+    A thread-safe TTL + LRU cache of weather results.
+
+    Successful results live for ``ttl`` seconds. Negative results (such as
+    unknown cities) live for the shorter ``negative_ttl``. When more than
+    ``max_entries`` results are stored, the least recently used one is
+    evicted.
+    """
+
+    def __init__(self, ttl=600, max_entries=1024, negative_ttl=60, path=None):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds a successful result stays fresh (default: 600)
+            max_entries: Maximum number of cached results (default: 1024)
+            negative_ttl: Seconds a negative result stays fresh (default: 60)
+            path: Optional file to persist to. Paths ending in .db, .sqlite
+                or .sqlite3 use SQLite and are written through on every
+                change; other paths hold JSON written on ``save``/``close``.
+        """
+        if max_entries < 1:
+            raise ValueError("Cache must hold at least one entry!")
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        # key -> (expires_at, result), least recently used first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._dirty = False
+
+        if path and path.endswith(SQLITE_SUFFIXES):
+            self._open_sqlite()
+        elif path and os.path.exists(path):
+            self._load_json()
+
+    def _open_sqlite(self):
+        """Open the SQLite file and load the entries that are still fresh."""
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS weather_cache (
+                city TEXT NOT NULL,
+                units TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (city, units)
+            )
+        """)
+        now = time.time()
+        self._db.execute("DELETE FROM weather_cache WHERE expires_at <= ?", (now,))
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT city, units, expires_at, result FROM weather_cache "
+            "ORDER BY expires_at"
+        )
+        for city, units, expires_at, result in rows:
+            self._entries[(city, units)] = (expires_at, json.loads(result))
+        self._trim()
+
+    def _load_json(self):
+        """Load the entries from a JSON cache file that are still fresh."""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+        now = time.time()
+        for city, units, expires_at, result in rows:
+            if expires_at > now:
+                self._entries[(city, units)] = (expires_at, result)
+        self._trim()
+
+    def _trim(self):
+        """Evict least recently used entries until the size cap holds."""
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            self._forget(key)
+
+    def _forget(self, key):
+        """Drop an entry from the persistent copy."""
+        if self._db is not None:
+            self._db.execute("DELETE FROM weather_cache WHERE city = ? AND units = ?", key)
+            self._db.commit()
+        else:
+            self._dirty = True
+
+    def get(self, city, units):
+        """
+        Return a copy of the cached result for a query, or None.
+
+        Expired entries are dropped and count as misses.
+        """
+        key = cache_key(city, units)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(entry[1])
+                del self._entries[key]
+                self.expirations += 1
+                self._forget(key)
+            self.misses += 1
+            return None
+
+    def put(self, city, units, result, negative=False):
+        """
+        Store a result for a query.
+
+        Args:
+            city: City name as queried
+            units: Temperature units
+            result: Result dictionary from WeatherApp
+            negative: Result is a cacheable error and uses ``negative_ttl``
+        """
+        ttl = self.negative_ttl if negative else self.ttl
+        if ttl <= 0:
+            return
+        key = cache_key(city, units)
+        expires_at = time.time() + ttl
+        result = dict(result)
+        with self._lock:
+            self._entries[key] = (expires_at, result)
+            self._entries.move_to_end(key)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO weather_cache VALUES (?, ?, ?, ?)",
+                    (key[0], key[1], expires_at, json.dumps(result))
+                )
+                self._db.commit()
+            else:
+                self._dirty = True
+            self._trim()
+
+    def clear(self):
+        """Remove every cached result."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM weather_cache")
+                self._db.commit()
+            else:
+                self._dirty = True
+
+    def stats(self):
+        """Return the cache counters as a dictionary."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def save(self):
+        """Write the cache to its JSON file (SQLite is always up to date)."""
+        if not self.path or self.path.endswith(SQLITE_SUFFIXES):
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            rows = [[city, units, expires_at, result]
+                    for (city, units), (expires_at, result) in self._entries.items()
+                    if expires_at > now]
+            # Write to a temporary file first so a crash never leaves a torn cache
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(rows, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._dirty = False
+
+    def close(self):
+        """Persist the cache and release the database connection."""
+        self.save()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
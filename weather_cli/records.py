@@ -0,0 +1,169 @@
+"""
+Weather Records
+Compact storage for parsed weather observations.
+
+A single ``Observation`` uses ``__slots__`` instead of a per-entry dict.
+An ``ObservationTable`` keeps many observations (a forecast or a bulk
+lookup) as typed arrays, one per field, with one shared string object per
+distinct city, country and description. That makes a large forecast many
+times smaller than a list of dicts.
+"""
+
+import sys
+from array import array
+
+
+UNIT_SYMBOLS = {'metric': '°C', 'imperial': '°F'}
+
+# Numeric fields and their array typecodes
+NUMERIC_FIELDS = (
+    ('time', 'q'),
+    ('temperature', 'd'),
+    ('feels_like', 'd'),
+    ('temp_min', 'd'),
+    ('temp_max', 'd'),
+    ('humidity', 'd'),
+    ('pressure', 'd'),
+    ('wind_speed', 'd')
+)
+TEXT_FIELDS = ('city', 'country', 'description')
+FIELDS = tuple(name for name, _ in NUMERIC_FIELDS) + TEXT_FIELDS
+
+
+def unit_symbol(units):
+    """Return the temperature symbol for a units setting."""
+    return UNIT_SYMBOLS.get(units, 'K')
+
+
+def _number(value):
+    """Return a stored number as an int when it has no fractional part."""
+    return int(value) if value.is_integer() else value
+
+
+class Observation:
+    """One weather observation (current conditions or a forecast step)."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, time, temperature, feels_like, temp_min, temp_max,
+                 humidity, pressure, wind_speed, city, country, description):
+        self.time = time
+        self.temperature = temperature
+        self.feels_like = feels_like
+        self.temp_min = temp_min
+        self.temp_max = temp_max
+        self.humidity = humidity
+        self.pressure = pressure
+        self.wind_speed = wind_speed
+        self.city = city
+        self.country = country
+        self.description = description
+
+    def to_dict(self, units='metric'):
+        """Return the observation in the dictionary shape ``get_weather`` uses."""
+        return {
+            'time': self.time,
+            'city': self.city,
+            'country': self.country,
+            'temperature': self.temperature,
+            'feels_like': self.feels_like,
+            'temp_min': self.temp_min,
+            'temp_max': self.temp_max,
+            'humidity': self.humidity,
+            'pressure': self.pressure,
+            'description': self.description,
+            'wind_speed': self.wind_speed,
+            'unit_symbol': unit_symbol(units)
+        }
+
+    def __repr__(self):
+        return (f"Observation(time={self.time}, city={self.city!r}, "
+                f"temperature={self.temperature}, description={self.description!r})")
+
+
+class ObservationTable:
+    """Many observations stored column by column in typed arrays."""
+
+    def __init__(self, units='metric', city=None, country=None):
+        """
+        Create an empty table.
+
+        Args:
+            units: Temperature units the values are in
+            city: Default city for entries that do not name one (forecasts)
+            country: Default country for entries that do not name one
+        """
+        self.units = units
+        self.city = city
+        self.country = country
+        self.columns = {name: array(typecode) for name, typecode in NUMERIC_FIELDS}
+        for name in TEXT_FIELDS:
+            self.columns[name] = []
+        # One shared object per distinct string
+        self._strings = {}
+
+    def _intern(self, text):
+        return self._strings.setdefault(text, text)
+
+    def append_api_entry(self, entry):
+        """
+        Add an entry from an API response ("list" item of a forecast or
+        a current-weather object of a bulk lookup).
+        """
+        columns = self.columns
+        main = entry['main']
+        columns['time'].append(entry.get('dt', 0))
+        columns['temperature'].append(main['temp'])
+        columns['feels_like'].append(main['feels_like'])
+        columns['temp_min'].append(main['temp_min'])
+        columns['temp_max'].append(main['temp_max'])
+        columns['humidity'].append(main['humidity'])
+        columns['pressure'].append(main['pressure'])
+        columns['wind_speed'].append(entry['wind']['speed'])
+        city = entry.get('name')
+        columns['city'].append(self._intern(city) if city else None)
+        country = entry.get('sys', {}).get('country')
+        columns['country'].append(self._intern(country) if country else None)
+        columns['description'].append(self._intern(entry['weather'][0]['description'].title()))
+
+    def extend_api_entries(self, entries):
+        """Add every entry of an iterable of API entries."""
+        for entry in entries:
+            self.append_api_entry(entry)
+
+    def extend(self, other):
+        """Append every entry of another table."""
+        for name, column in other.columns.items():
+            if name in TEXT_FIELDS:
+                self.columns[name].extend(self._intern(text) if text else None
+                                          for text in column)
+            else:
+                self.columns[name].extend(column)
+
+    def __len__(self):
+        return len(self.columns['time'])
+
+    def __getitem__(self, i):
+        columns = self.columns
+        return Observation(
+            columns['time'][i],
+            *(_number(columns[name][i]) for name, _ in NUMERIC_FIELDS[1:]),
+            columns['city'][i] or self.city,
+            columns['country'][i] or self.country,
+            columns['description'][i]
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_dicts(self, units=None):
+        """Yield every observation in the dictionary shape ``get_weather`` uses."""
+        units = units or self.units
+        for observation in self:
+            yield observation.to_dict(units)
+
+    def memory_size(self):
+        """Return the approximate memory used by the table in bytes."""
+        size = sum(sys.getsizeof(column) for column in self.columns.values())
+        return size + sum(sys.getsizeof(text) for text in self._strings)
@@ -0,0 +1,134 @@
+"""
+Request Resilience
+Client-side rate limiting, retries with jittered exponential backoff and
+single-flight coalescing of identical in-flight requests for WeatherApp.
+"""
+
+import random
+import threading
+import time
+
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+class TokenBucket:
+    """
+    A thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Each request takes one token and waits for it if the bucket is empty.
+    Waiting callers reserve their token up front, so they are served in
+    arrival order and never oversubscribe the limit.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate: Tokens added per second, e.g. 60 / 60 for 60 per minute
+            capacity: Largest burst allowed (default: one second's worth,
+                at least 1)
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive!")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests, burst=None):
+        """Create a bucket allowing ``requests`` per minute."""
+        return cls(requests / 60, burst)
+
+    def acquire(self, tokens=1):
+        """Take tokens, sleeping until they are available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity,
+                               self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class RetryPolicy:
+    """Retries with exponential backoff and full jitter."""
+
+    def __init__(self, attempts=3, base_delay=0.5, max_delay=8.0,
+                 retry_statuses=RETRY_STATUSES):
+        """
+        Args:
+            attempts: Total tries per request, including the first (default: 3)
+            base_delay: Backoff before the first retry in seconds (default: 0.5)
+            max_delay: Upper bound for any single backoff (default: 8.0)
+            retry_statuses: HTTP statuses worth retrying (default: 429 and
+                5xx gateway errors)
+        """
+        if attempts < 1:
+            raise ValueError("Attempts must be at least 1!")
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def should_retry(self, status):
+        """Return True for retryable statuses and network errors (None)."""
+        return status is None or status in self.retry_statuses
+
+    def delay(self, attempt):
+        """
+        Return the backoff before retry number ``attempt`` (0-based).
+
+        Full jitter spreads out clients that failed together, so they do
+        not all retry at the same moment.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one.
+
+    The first caller for a key runs the function; callers that arrive
+    while it is running wait and receive the same result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> [done event, result, exception]
+        self._calls = {}
+
+    def do(self, key, function):
+        """
+        Call ``function()`` once per key among concurrent callers.
+
+        Returns:
+            Tuple of (result, shared), where shared is True for callers
+            that received another caller's result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = [threading.Event(), None, None]
+
+        if not leader:
+            call[0].wait()
+            if call[2] is not None:
+                raise call[2]
+            return call[1], True
+
+        try:
+            call[1] = function()
+        except BaseException as e:
+            call[2] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call[0].set()
+        return call[1], False
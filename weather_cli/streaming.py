@@ -0,0 +1,141 @@
+"""
+Streaming JSON Parsing
+Read the entries of a large JSON list straight from an HTTP response,
+one entry at a time, without loading the whole body into memory.
+"""
+
+import codecs
+import json
+import re
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_CHARS = "0123456789+-.eE"
+
+
+def iter_json_list(stream, key='list', meta=None, chunk_size=64 * 1024):
+    """
+    Yield the items of the array stored under ``key`` in a JSON object.
+
+    The object is read incrementally from a binary stream (such as an
+    http.client response), so only about ``chunk_size`` bytes plus the
+    current item are held in memory. The other top-level fields are small
+    and are stored in ``meta`` as they are passed, whether they come
+    before or after the list.
+
+    Args:
+        stream: Binary file-like object holding a UTF-8 JSON object
+        key: Name of the array to stream (default: "list")
+        meta: Optional dictionary that receives the other top-level fields
+        chunk_size: Bytes read at a time
+
+    Raises:
+        json.JSONDecodeError: If the stream is not a well-formed JSON object
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buf = ""
+    pos = 0
+    eof = False
+    # States: "{", "key", "first key", ":", "value", "object delimiter",
+    # "item", "first item", "array delimiter", "done"
+    expect = "{"
+    current_key = None
+
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos == len(buf):
+            if expect == "done":
+                return
+            if eof:
+                raise json.JSONDecodeError("Unexpected end of JSON object", buf, pos)
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buf = text.decode(chunk, final=eof)
+            pos = 0
+            continue
+
+        char = buf[pos]
+        if expect == "done":
+            raise json.JSONDecodeError("Extra data", buf, pos)
+        if expect == "{":
+            if char != "{":
+                raise json.JSONDecodeError("Expecting '{'", buf, pos)
+            expect = "first key"
+            pos += 1
+            continue
+        if expect == ":":
+            if char != ":":
+                raise json.JSONDecodeError("Expecting ':' delimiter", buf, pos)
+            expect = "value"
+            pos += 1
+            continue
+        if expect == "object delimiter":
+            if char == "}":
+                expect = "done"
+            elif char == ",":
+                expect = "key"
+            else:
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+            pos += 1
+            continue
+        if expect == "array delimiter":
+            if char == "]":
+                expect = "object delimiter"
+            elif char == ",":
+                expect = "item"
+            else:
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+            pos += 1
+            continue
+        if expect == "first key" and char == "}":
+            expect = "done"
+            pos += 1
+            continue
+        if expect == "first item" and char == "]":
+            expect = "object delimiter"
+            pos += 1
+            continue
+        if expect == "value" and current_key == key and char == "[":
+            expect = "first item"
+            pos += 1
+            continue
+
+        if expect in ("key", "first key") and char != '"':
+            raise json.JSONDecodeError("Expecting property name enclosed in double quotes",
+                                       buf, pos)
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+            # A value that reaches the end of the buffer may continue in the
+            # next chunk, and a number cut off inside its exponent ("1.5e")
+            # parses as a shorter number, so only trust a number once a
+            # character that cannot belong to it follows
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                complete = eof or buf[end:].strip(_NUMBER_CHARS) != ""
+            else:
+                complete = eof or end < len(buf)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + text.decode(chunk, final=eof)
+            pos = 0
+            continue
+
+        pos = end
+        if expect in ("key", "first key"):
+            current_key = value
+            expect = ":"
+        elif expect == "value":
+            if meta is not None:
+                meta[current_key] = value
+            expect = "object delimiter"
+        else:
+            expect = "array delimiter"
+            yield value
+        if pos >= chunk_size:
+            buf = buf[pos:]
+            pos = 0
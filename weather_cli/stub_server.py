@@ -0,0 +1,284 @@
+"""
+Stub Weather Server
+A local stand-in for the OpenWeatherMap current-weather API, for tests
+and benchmarks that must run without network access or an API key.
+
+Responses have the same shape as /data/2.5/weather, /data/2.5/forecast
+and the bulk /data/2.5/group endpoint. Weather values are derived from
+the city name, so repeated queries agree with each other.
+The server can simulate latency, jitter, invalid keys (401), unknown
+cities (404), rate limiting (429) and server errors (503).
+
+Usage:
+    python stub_server.py --port 8080 --latency 0.05 --jitter 0.02 --api-key test
+    OPENWEATHER_API_KEY=test python weather.py   # with base_url pointed at it
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import parse
+
+
+FORECAST_STEPS = 40
+FORECAST_START = 1700000000
+FORECAST_INTERVAL = 3 * 3600
+
+DESCRIPTIONS = ("clear sky", "few clouds", "scattered clouds", "broken clouds",
+                "shower rain", "rain", "thunderstorm", "snow", "mist")
+
+
+def _seed(city):
+    """Return a stable integer derived from a city name."""
+    normalized = ' '.join(city.split()).casefold()
+    return int.from_bytes(hashlib.sha1(normalized.encode()).digest()[:8], "little")
+
+
+def _convert(celsius, units):
+    """Convert a Celsius temperature to the requested units."""
+    if units == 'imperial':
+        return round(celsius * 9 / 5 + 32, 2)
+    if units == 'metric':
+        return round(celsius, 2)
+    return round(celsius + 273.15, 2)
+
+
+def weather_payload(city, units='standard'):
+    """Build a current-weather response body for a city."""
+    seed = _seed(city)
+    temp = (seed % 450) / 10 - 10
+    wind = (seed >> 16) % 150 / 10
+    return {
+        'coord': {'lon': 0.0, 'lat': 0.0},
+        'weather': [{'id': 800, 'main': 'Weather',
+                     'description': DESCRIPTIONS[(seed >> 8) % len(DESCRIPTIONS)],
+                     'icon': '01d'}],
+        'main': {
+            'temp': _convert(temp, units),
+            'feels_like': _convert(temp - wind / 3, units),
+            'temp_min': _convert(temp - 2, units),
+            'temp_max': _convert(temp + 2, units),
+            'pressure': 980 + (seed >> 24) % 60,
+            'humidity': 20 + (seed >> 32) % 80
+        },
+        'wind': {'speed': wind, 'deg': (seed >> 40) % 360},
+        'sys': {'country': 'XX'},
+        'id': seed % 10000000,
+        'name': ' '.join(city.split()).title(),
+        'cod': 200
+    }
+
+
+def forecast_payload(city, units='standard', count=FORECAST_STEPS):
+    """Build a 3-hourly forecast response body for a city."""
+    current = weather_payload(city, units)
+    steps = []
+    for i in range(count):
+        step = weather_payload(f"{city} {i}", units)
+        steps.append({
+            'dt': FORECAST_START + i * FORECAST_INTERVAL,
+            'main': step['main'],
+            'weather': step['weather'],
+            'wind': step['wind'],
+            'dt_txt': time.strftime('%Y-%m-%d %H:%M:%S',
+                                    time.gmtime(FORECAST_START + i * FORECAST_INTERVAL))
+        })
+    # As in the real API, the city block follows the (possibly long) list
+    return {
+        'cod': '200',
+        'message': 0,
+        'cnt': count,
+        'list': steps,
+        'city': {'id': current['id'], 'name': current['name'],
+                 'country': current['sys']['country']}
+    }
+
+
+def group_payload(city_ids, units='standard'):
+    """Build a bulk current-weather response body for city IDs."""
+    entries = []
+    for city_id in city_ids:
+        entry = weather_payload(f"City {city_id}", units)
+        entry['id'] = city_id
+        entries.append(entry)
+    return {'cnt': len(entries), 'list': entries}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler; settings live on the server object."""
+
+    protocol_version = 'HTTP/1.1'
+    # Buffer the response so headers and body leave in a single write
+    wbufsize = -1
+
+    def do_GET(self):
+        server = self.server
+        server.count_request()
+        url = parse.urlsplit(self.path)
+        query = parse.parse_qs(url.query)
+
+        if server.latency or server.jitter:
+            time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+
+        if url.path not in ('/data/2.5/weather', '/data/2.5/forecast', '/data/2.5/group'):
+            self._send(404, {'cod': '404', 'message': 'Internal error'})
+        elif server.api_key is not None and query.get('appid', [''])[0] != server.api_key:
+            self._send(401, {'cod': 401, 'message': 'Invalid API key.'})
+        elif not server.allow_request():
+            self._send(429, {'cod': 429, 'message': 'Too many requests.'})
+        elif server.error_rate and random.random() < server.error_rate:
+            self._send(503, {'cod': 503, 'message': 'Service unavailable.'})
+        elif url.path == '/data/2.5/group':
+            units = query.get('units', ['standard'])[0]
+            try:
+                city_ids = [int(i) for i in query.get('id', [''])[0].split(',')]
+            except ValueError:
+                self._send(400, {'cod': '400', 'message': 'Invalid ID'})
+                return
+            self._send(200, group_payload(city_ids, units))
+        else:
+            city = query.get('q', [''])[0]
+            units = query.get('units', ['standard'])[0]
+            if not city.strip() or ' '.join(city.split()).casefold() in server.missing:
+                self._send(404, {'cod': '404', 'message': 'city not found'})
+            elif url.path == '/data/2.5/forecast':
+                count = int(query.get('cnt', [FORECAST_STEPS])[0])
+                self._send(200, forecast_payload(city, units, count))
+            else:
+                self._send(200, weather_payload(city, units))
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StubWeatherServer(ThreadingHTTPServer):
+    """A threaded stub of the OpenWeatherMap current-weather API."""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 api_key=None, missing=("Atlantis", "Nowhere"), rate_limit=None,
+                 error_rate=0.0, verbose=False):
+        """
+        Initialize the server (it starts listening immediately).
+
+        Args:
+            host: Interface to bind (default: 127.0.0.1)
+            port: Port to bind; 0 picks a free one (default: 0)
+            latency: Seconds added to every response (default: 0)
+            jitter: Latency varies uniformly by up to +/- this much (default: 0)
+            api_key: Required appid; None accepts any key (default: None)
+            missing: City names answered with 404
+            rate_limit: Requests per second before answering 429
+                (default: unlimited)
+            error_rate: Fraction of requests answered with 503 (default: 0)
+            verbose: Log every request to stderr (default: False)
+        """
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.api_key = api_key
+        self.missing = frozenset(' '.join(c.split()).casefold() for c in missing)
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.verbose = verbose
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._window = 0
+        self._window_count = 0
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """The current-weather URL to pass to WeatherApp."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/data/2.5/weather"
+
+    def count_request(self):
+        """Count a request."""
+        with self._lock:
+            self.requests += 1
+
+    def allow_request(self):
+        """Return False once ``rate_limit`` requests arrived this second."""
+        if self.rate_limit is None:
+            return True
+        with self._lock:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window, self._window_count = window, 0
+            self._window_count += 1
+            return self._window_count <= self.rate_limit
+
+    def start(self):
+        """Serve requests on a background thread and return the server."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Local stub of the OpenWeatherMap API.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="interface to bind (default: 127.0.0.1)")
+    parser.add_argument("-p", "--port", type=int, default=8080,
+                        help="port to listen on (default: 8080)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds added to every response (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="random +/- latency variation in seconds (default: 0)")
+    parser.add_argument("--api-key",
+                        help="require this appid (default: accept any)")
+    parser.add_argument("--missing", nargs="*", default=["Atlantis", "Nowhere"],
+                        help="cities answered with 404 (default: Atlantis Nowhere)")
+    parser.add_argument("--rate-limit", type=int,
+                        help="requests per second before answering 429")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of requests answered with 503 (default: 0)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="log every request")
+    args = parser.parse_args(argv)
+
+    server = StubWeatherServer(args.host, args.port, args.latency, args.jitter,
+                               args.api_key, args.missing, args.rate_limit,
+                               args.error_rate, args.verbose)
+    print(f"Serving {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Pooled HTTP Transport
+Keep-alive HTTP connections for WeatherApp, built on http.client.
+
+Back-to-back requests to the same host reuse an open connection instead
+of paying for DNS and a TCP (and TLS) handshake every time.
+"""
+
+import http.client
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib import parse
+
+
+# Errors that mean a reused keep-alive connection was closed by the server
+STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError, ConnectionAbortedError)
+
+
+class PooledTransport:
+    """
+    A thread-safe pool of persistent HTTP/HTTPS connections.
+
+    Up to ``pool_size`` idle connections are kept per host. More may be
+    opened when many threads make requests at once; the extra ones are
+    closed when they are released. Connections idle for longer than
+    ``idle_timeout`` seconds are closed instead of reused, and a request
+    on a reused connection that the server has already dropped is retried
+    once on a fresh connection.
+    """
+
+    def __init__(self, pool_size=4, idle_timeout=30, timeout=10):
+        """
+        Initialize the transport.
+
+        Args:
+            pool_size: Idle connections kept per host (default: 4)
+            idle_timeout: Seconds an idle connection may be reused (default: 30)
+            timeout: Socket timeout in seconds (default: 10)
+        """
+        if pool_size < 1:
+            raise ValueError("Pool size must be at least 1!")
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.connections_opened = 0
+        # (scheme, host, port) -> deque of (connection, last_used)
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _new_connection(self, scheme, host, port):
+        """Open a new connection to a host."""
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        elif scheme == 'http':
+            conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        else:
+            raise ValueError(f"Unsupported URL scheme: {scheme}")
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    def _acquire(self, key):
+        """Return (connection, reused) for a host, reusing a fresh idle one."""
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                conn, last_used = idle.pop()
+                if now - last_used <= self.idle_timeout:
+                    return conn, True
+                conn.close()
+        return self._new_connection(*key), False
+
+    def _release(self, key, conn):
+        """Return a connection to the pool, or close it if the pool is full."""
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            if len(idle) < self.pool_size:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    @contextmanager
+    def open(self, url, headers=None):
+        """
+        Send a GET request and yield the http.client response.
+
+        The connection goes back to the pool if the body was read to the
+        end and the server allows keep-alive; otherwise it is closed.
+
+        Raises:
+            OSError or http.client.HTTPException on network errors
+        """
+        parts = parse.urlsplit(url)
+        default_port = 443 if parts.scheme == 'https' else 80
+        key = (parts.scheme, parts.hostname, parts.port or default_port)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+
+        conn, reused = self._acquire(key)
+        while True:
+            try:
+                conn.request('GET', target, headers=headers or {})
+                response = conn.getresponse()
+                break
+            except STALE_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                # The server dropped the idle connection; retry on a new one
+                conn, reused = self._new_connection(*key), False
+            except BaseException:
+                conn.close()
+                raise
+
+        try:
+            yield response
+        except BaseException:
+            conn.close()
+            raise
+        if response.isclosed() and not response.will_close:
+            self._release(key, conn)
+        else:
+            conn.close()
+
+    def get(self, url, headers=None):
+        """
+        Send a GET request and read the whole response.
+
+        Returns:
+            Tuple of (HTTP status, body bytes)
+        """
+        with self.open(url, headers) as response:
+            return response.status, response.read()
+
+    def close(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn, _ in connections:
+                conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -4,23 +4,61 @@ A command-line weather application using OpenWeatherMap API.
 Note: Requires an API key from https://openweathermap.org/api
 """
 
+import http.client
 import json
 import os
-from urllib import request, parse, error
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from urllib import parse
+
+from cache import WeatherCache, cache_key
+from records import ObservationTable, unit_symbol
+from resilience import RetryPolicy, SingleFlight
+from streaming import iter_json_list
+from transport import PooledTransport
+
+
+DEFAULT_BASE_URL = "http://api.openweathermap.org/data/2.5/weather"
+# The bulk endpoint accepts at most this many city IDs per request
+GROUP_SIZE = 20
 
 
 class WeatherApp:
     """A simple weather application using OpenWeatherMap API."""
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, cache=None, transport=None, base_url=None,
+                 rate_limiter=None, retry=None):
         """
         Initialize the weather app.
         
         Args:
             api_key: OpenWeatherMap API key. If None, will try to read from environment.
+            cache: Optional WeatherCache (see cache.py). Results for the same
+                city and units are served from it until they expire.
+            transport: HTTP transport with a ``get(url)`` method returning
+                (status, body), and an ``open(url)`` context manager yielding
+                a response for forecasts and bulk lookups. Defaults to a
+                keep-alive PooledTransport (see transport.py).
+            base_url: Current-weather endpoint, e.g. a local stub server.
+                The forecast and bulk endpoints live next to it.
+            rate_limiter: Optional TokenBucket (see resilience.py) shared by
+                every request, including retries
+            retry: RetryPolicy for rate-limited, 5xx and network failures.
+                Defaults to RetryPolicy(); pass RetryPolicy(attempts=1) to
+                disable retries.
         """
         self.api_key = api_key or os.getenv('OPENWEATHER_API_KEY')
-        self.base_url = "http://api.openweathermap.org/data/2.5/weather"
+        self.base_url = base_url or DEFAULT_BASE_URL
+        api_root = self.base_url.rsplit('/', 1)[0]
+        self.forecast_url = f"{api_root}/forecast"
+        self.group_url = f"{api_root}/group"
+        self.cache = cache
+        self.transport = transport or PooledTransport()
+        self.rate_limiter = rate_limiter
+        self.retry = retry or RetryPolicy()
+        # Concurrent lookups of the same city and units share one request
+        self._flights = SingleFlight()
     
     def get_weather(self, city, units='metric'):
         """
@@ -38,6 +76,89 @@ class WeatherApp:
                 'error': 'API key not found. Set OPENWEATHER_API_KEY environment variable or provide key.'
             }
         
+        if self.cache is not None:
+            cached = self.cache.get(city, units)
+            if cached is not None:
+                return cached
+        
+        result, shared = self._flights.do(cache_key(city, units),
+                                          lambda: self._lookup(city, units))
+        return dict(result) if shared else result
+    
+    def _lookup(self, city, units):
+        """Fetch a city with retries and store the outcome in the cache."""
+        result, status = self._fetch_with_retry(city, units)
+        
+        if self.cache is not None:
+            if 'error' not in result:
+                self.cache.put(city, units, result)
+            elif status == 404:
+                # Unknown cities stay unknown; remember that for a short while
+                self.cache.put(city, units, result, negative=True)
+        
+        return result
+    
+    def _fetch_with_retry(self, city, units):
+        """Call ``_fetch`` under the rate limiter, backing off between retries."""
+        for attempt in range(self.retry.attempts):
+            if attempt:
+                time.sleep(self.retry.delay(attempt - 1))
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            result, status = self._fetch(city, units)
+            if not self.retry.should_retry(status):
+                break
+        return result, status
+    
+    def get_weather_many(self, cities, units='metric', concurrency=8):
+        """
+        Get weather information for many cities concurrently.
+        
+        Lookups run on a pool of ``concurrency`` threads. Cities are read
+        from the iterable lazily, with at most two lookups per thread in
+        flight, so any number of cities can be streamed through.
+        
+        Args:
+            cities: Iterable of city names
+            units: Temperature units ('metric', 'imperial', 'standard')
+            concurrency: Number of lookups running at once (default: 8)
+        
+        Yields:
+            Tuples of (city, result) in completion order; result has the
+            same shape as ``get_weather``, including ``{'error': ...}``
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1!")
+        cities = iter(cities)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        pending = {}
+        
+        def submit_next():
+            city = next(cities, None)
+            if city is not None:
+                pending[executor.submit(self.get_weather, city, units)] = city
+        
+        try:
+            for _ in range(concurrency * 2):
+                submit_next()
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    city = pending.pop(future)
+                    yield city, future.result()
+                    submit_next()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _fetch(self, city, units):
+        """
+        Query the API for a city.
+        
+        Returns:
+            Tuple of (result dictionary, HTTP status or None on network errors)
+        """
+        status = None
         try:
             params = {
                 'q': city,
@@ -47,28 +168,138 @@ class WeatherApp:
             
             url = f"{self.base_url}?{parse.urlencode(params)}"
             
-            with request.urlopen(url) as response:
-                data = json.loads(response.read().decode())
-                return self.parse_weather_data(data, units)
-        
-        except error.HTTPError as e:
-            if e.code == 404:
-                return {'error': f'City "{city}" not found!'}
-            elif e.code == 401:
-                return {'error': 'Invalid API key!'}
-            else:
-                return {'error': f'HTTP Error: {e.code}'}
+            status, body = self.transport.get(url)
+            
+            if status == 200:
+                data = json.loads(body.decode())
+                return self.parse_weather_data(data, units), status
+            return self._status_error(status, f'City "{city}" not found!'), status
         
-        except error.URLError:
-            return {'error': 'Network error. Please check your internet connection.'}
+        except (OSError, http.client.HTTPException):
+            return {'error': 'Network error. Please check your internet connection.'}, None
         
         except Exception as e:
-            return {'error': f'An error occurred: {str(e)}'}
+            return {'error': f'An error occurred: {str(e)}'}, status
+    
+    def _status_error(self, status, not_found):
+        """Return the error dictionary for a failed HTTP status."""
+        if status == 404:
+            return {'error': not_found}
+        elif status == 401:
+            return {'error': 'Invalid API key!'}
+        elif status == 429:
+            return {'error': 'Rate limit exceeded. Please try again later.'}
+        elif status >= 500:
+            return {'error': f'Weather service unavailable (HTTP {status}).'}
+        else:
+            return {'error': f'HTTP Error: {status}'}
+    
+    def get_forecast(self, city, units='metric', count=None):
+        """
+        Get the 5-day / 3-hour forecast for a city.
+        
+        The response is parsed entry by entry as it arrives, straight into
+        a compact ObservationTable (see records.py).
+        
+        Args:
+            city: City name
+            units: Temperature units ('metric', 'imperial', 'standard')
+            count: Optional number of forecast steps to request
+        
+        Returns:
+            ObservationTable of forecast steps, or a dictionary with an
+            'error' key as returned by ``get_weather``
+        """
+        if not self.api_key:
+            return {
+                'error': 'API key not found. Set OPENWEATHER_API_KEY environment variable or provide key.'
+            }
+        
+        params = {'q': city, 'appid': self.api_key, 'units': units}
+        if count is not None:
+            params['cnt'] = count
+        url = f"{self.forecast_url}?{parse.urlencode(params)}"
+        
+        result, meta = self._fetch_table(url, units, f'City "{city}" not found!')
+        if isinstance(result, ObservationTable):
+            location = meta.get('city') or {}
+            result.city = location.get('name', city)
+            result.country = location.get('country')
+        return result
+    
+    def get_weather_group(self, city_ids, units='metric'):
+        """
+        Get current weather for many cities by OpenWeatherMap city ID.
+        
+        IDs are sent in bulk requests of up to GROUP_SIZE each, and every
+        response is parsed incrementally into one ObservationTable.
+        
+        Args:
+            city_ids: Iterable of numeric city IDs
+            units: Temperature units ('metric', 'imperial', 'standard')
+        
+        Returns:
+            ObservationTable with one entry per city, or a dictionary with
+            an 'error' key as returned by ``get_weather``
+        """
+        if not self.api_key:
+            return {
+                'error': 'API key not found. Set OPENWEATHER_API_KEY environment variable or provide key.'
+            }
+        
+        city_ids = [str(city_id) for city_id in city_ids]
+        table = ObservationTable(units)
+        for start in range(0, len(city_ids), GROUP_SIZE):
+            ids = city_ids[start:start + GROUP_SIZE]
+            params = {'id': ','.join(ids), 'appid': self.api_key, 'units': units}
+            url = f"{self.group_url}?{parse.urlencode(params)}"
+            result, _ = self._fetch_table(url, units, f'Cities {", ".join(ids)} not found!')
+            if not isinstance(result, ObservationTable):
+                return result
+            table.extend(result)
+        return table
+    
+    def _fetch_table(self, url, units, not_found):
+        """
+        Stream the "list" of a forecast or bulk response into a table.
+        
+        Rate limiting and retries apply as for ``get_weather``.
+        
+        Returns:
+            Tuple of (ObservationTable or error dictionary, dictionary of the
+            other top-level response fields)
+        """
+        for attempt in range(self.retry.attempts):
+            if attempt:
+                time.sleep(self.retry.delay(attempt - 1))
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            
+            status = None
+            meta = {}
+            try:
+                with self.transport.open(url) as response:
+                    status = response.status
+                    if status == 200:
+                        table = ObservationTable(units)
+                        table.extend_api_entries(iter_json_list(response, 'list', meta))
+                        return table, meta
+                    response.read()
+                result = self._status_error(status, not_found)
+            
+            except (OSError, http.client.HTTPException):
+                result = {'error': 'Network error. Please check your internet connection.'}
+                status = None
+            
+            except Exception as e:
+                return {'error': f'An error occurred: {str(e)}'}, meta
+            
+            if not self.retry.should_retry(status):
+                break
+        return result, meta
     
     def parse_weather_data(self, data, units):
         """Parse the API response into a readable format."""
-        unit_symbol = '°C' if units == 'metric' else ('°F' if units == 'imperial' else 'K')
-        
         return {
             'city': data['name'],
             'country': data['sys']['country'],
@@ -80,7 +311,7 @@ class WeatherApp:
             'pressure': data['main']['pressure'],
             'description': data['weather'][0]['description'].title(),
             'wind_speed': data['wind']['speed'],
-            'unit_symbol': unit_symbol
+            'unit_symbol': unit_symbol(units)
         }
     
     def display_weather(self, weather_data):
@@ -100,6 +331,21 @@ class WeatherApp:
         print(f"🌀 Pressure: {weather_data['pressure']} hPa")
         print(f"💨 Wind Speed: {weather_data['wind_speed']} m/s")
         print("\n" + "=" * 60 + "\n")
+    
+    def display_forecast(self, forecast):
+        """Display a forecast table, one line per step."""
+        if isinstance(forecast, dict):
+            print(f"\n❌ {forecast['error']}\n")
+            return
+        
+        print("\n" + "=" * 60)
+        print(f"Forecast for {forecast.city}, {forecast.country}".center(60))
+        print("=" * 60)
+        for step in forecast:
+            moment = datetime.fromtimestamp(step.time, timezone.utc).strftime('%a %d %b %H:%M')
+            symbol = unit_symbol(forecast.units)
+            print(f"{moment} UTC  {step.temperature:>6}{symbol}  {step.description}")
+        print("=" * 60 + "\n")
 
 
 def main():
@@ -126,17 +372,22 @@ def main():
         else:
             print("\n🔍 Running in demo mode (will show error when querying weather)")
     
-    weather_app = WeatherApp(api_key)
+    # Repeated lookups are cached; set OPENWEATHER_CACHE to keep them across runs
+    cache = WeatherCache(path=os.getenv('OPENWEATHER_CACHE'))
+    weather_app = WeatherApp(api_key, cache)
     
     while True:
         print("\nMenu:")
         print("1. Get Weather by City")
-        print("2. Change Temperature Units")
-        print("3. Exit")
+        print("2. Get 5-Day Forecast")
+        print("3. Change Temperature Units")
+        print("4. Exit")
         
-        choice = input("\nSelect option (1-3): ").strip()
+        choice = input("\nSelect option (1-4): ").strip()
         
-        if choice == '3':
+        if choice == '4':
+            cache.close()
+            weather_app.transport.close()
             print("Thank you for using Weather CLI!")
             break
         
@@ -153,6 +404,18 @@ def main():
                 print("City name cannot be empty!")
         
         elif choice == '2':
+            city = input("Enter city name: ").strip()
+            if city:
+                units = input("Units (metric/imperial) [metric]: ").strip().lower() or 'metric'
+                if units not in ['metric', 'imperial']:
+                    units = 'metric'
+                
+                forecast = weather_app.get_forecast(city, units)
+                weather_app.display_forecast(forecast)
+            else:
+                print("City name cannot be empty!")
+        
+        elif choice == '3':
             print("\nTemperature Units:")
             print("- metric: Celsius (°C)")
             print("- imperial: Fahrenheit (°F)")